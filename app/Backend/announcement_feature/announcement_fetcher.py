@@ -1,11 +1,31 @@
 import re
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 
-import requests
+import orjson
 from bs4 import BeautifulSoup
 
+try: # relative import if run as module
+    from http_session import make_session
+except ModuleNotFoundError: # absolute import if run as script
+    from Backend.http_session import make_session
+
+try: # relative import if run as module
+    import canvas_cache
+except ModuleNotFoundError: # absolute import if run as script
+    from Backend import canvas_cache
+
 BASE_URL = "https://canvas.ubc.ca/api/v1"
 START_TIME = 80  # days back to fetch announcements
+TIMEOUT = 10  # seconds per Canvas request
+
+_PUNCT_RE = re.compile(r"\s+([.,!?;:])")
+_NBSP_TABLE = {0xA0: None}  # str.translate table deleting non-breaking spaces
+_LINK_NEXT = re.compile(r'<([^>]+)>\s*;\s*rel="next"')
+
+# shared across fetchers so repeated Canvas calls reuse pooled connections
+_session = make_session()
 
 
 class AnnouncementFetcher:
@@ -40,63 +60,92 @@ class AnnouncementFetcher:
         self.course_names = {}
         self.course_ids = self.get_course_ids()
 
-    def is_current_term(self, term):
+    def _headers(self):
+        """
+        Builds the per-request headers for the Canvas API.
+
+        The token is sent per request rather than stored on the shared session,
+        since the session is reused across fetchers for different users.
+
+        Returns:
+            dict[str, str]: Headers containing the bearer token.
+        """
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def is_current_term(self, term, now=None):
         """
         Determines whether a given Canvas term is currently active.
 
         Args:
             term (dict): A term object returned by the Canvas API.
                 Expected keys include "start_at" and "end_at" (ISO-8601 format).
+            now (datetime, optional): Aware reference time; defaults to the
+                current UTC time. Pass it in when checking many courses.
 
         Returns:
-            bool: True if the term start/end dates include the current UTC time; False otherwise.
+            bool: True if the term start/end dates include `now`; False otherwise.
         """
         start = term.get("start_at")
         end = term.get("end_at")
         if not start or not end:
             return False
-        now = datetime.now(timezone.utc)
+        if now is None:
+            now = datetime.now(timezone.utc)
 
-        start = datetime.fromisoformat(start.replace("Z", "+00:00"))
-        end = datetime.fromisoformat(end.replace("Z", "+00:00"))
+        start, end = canvas_cache.parse_bounds(start, end)
         return start <= now <= end
 
-    def get_course_ids(self):
+    def get_course_ids(self, force_refresh=False):
         """
         Retrieves the IDs of all active courses for the current term.
 
-        This function paginates through all user-accessible courses via
-        the Canvas `/courses` endpoint, filtering out inactive or restricted ones.
+        This function follows the `Link` pagination of the Canvas `/courses`
+        endpoint (100 per page), filtering out inactive or restricted ones.
+        A complete, non-empty result is cached on disk per token (see
+        `canvas_cache`) until it expires or the current term ends.
+
+        Args:
+            force_refresh (bool): Ignore the on-disk cache and refetch.
 
         Returns:
             list[int]: A list of Canvas course IDs for active current-term courses.
         """
+        if not force_refresh:
+            cached = canvas_cache.load_cache(self.token, "courses")
+            if cached is not None:
+                self.course_names.update(cached)
+                return [id for id, _ in cached]
+
         course_ids = set()
-        page = 1
+        term_end = None
+        now = datetime.now(timezone.utc)
         params = {
-            "include[]": "term"
+            "include[]": "term",
+            "per_page": 100,
         }  # if we need others later add here, cant be incremental
-        while True:
-            r = requests.get(
-                f"{BASE_URL}/courses",
-                headers={"Authorization": f"Bearer {self.token}"},
-                params={**params, "page": page},
-            )
-            data = r.json()
-
-            if not isinstance(data, list) or len(data) == 0:
-                break
+        data, complete = self._get_all_pages(f"{BASE_URL}/courses", params)
 
-            for course in data:
-                if (
-                    course.get("id") not in course_ids
-                    and course.get("access_restricted_by_date") is None
-                ):
-                    if self.is_current_term(course.get("term")):
-                        course_ids.add(course.get("id"))
-                        self.course_names[course.get("id")] = course.get("name")
-            page += 1
+        for course in data:
+            if (
+                course.get("id") not in course_ids
+                and course.get("access_restricted_by_date") is None
+            ):
+                if self.is_current_term(course.get("term"), now):
+                    course_ids.add(course.get("id"))
+                    self.course_names[course.get("id")] = course.get("name")
+                    end_at = course["term"].get("end_at")
+                    if end_at:
+                        end = datetime.fromisoformat(end_at).timestamp()
+                        term_end = end if term_end is None else min(term_end, end)
 
+        # a truncated or empty listing is not cached, so the next call retries
+        if complete and course_ids:
+            canvas_cache.store_cache(
+                self.token,
+                "courses",
+                [[id, self.course_names[id]] for id in course_ids],
+                term_end,
+            )
         return list(course_ids)
 
     def get_announcements(self):
@@ -111,6 +160,9 @@ class AnnouncementFetcher:
                     "message": str (plain text message)
                 }
         """
+        if not self.course_ids:
+            return {}
+
         params = []
         for c in self.course_ids:
             params.append(("context_codes[]", f"course_{c}"))
@@ -118,36 +170,58 @@ class AnnouncementFetcher:
         cutoff = datetime.now(timezone.utc) - timedelta(days=START_TIME)
         cutoff = cutoff.isoformat().replace("+00:00", "Z")
         params.append(("start_date", cutoff))
+        params.append(("per_page", 100))
+
+        # one paginated request covers every course via the repeated context_codes[]
+        data, _ = self._get_all_pages(f"{BASE_URL}/announcements", params)
+
+        announcementsByCourse = defaultdict(list)
+        for a in data:
+            context = a.get("context_code")
+            if context is not None:
+                id = int(context.split("_")[1])
+                # course gets an entry even if none of its posts are usable
+                msgs = announcementsByCourse[self.course_names.get(id)]
+                msg = a.get("message")
+                posted_at = a.get("posted_at")
+                if msg and posted_at:
+                    msg_text = self.html_to_string(msg)
+                    msgs.append({"posted_at": posted_at, "message": msg_text})
+
+        by_posted_at = itemgetter("posted_at")
+        for msgs in announcementsByCourse.values():
+            msgs.sort(key=by_posted_at)  # sort by posted_at ascending
+        return dict(announcementsByCourse)
 
-        announcementsByCourse = {}
-        seen_ids = set()
-        for course_id in self.course_ids:
-            url = f"{BASE_URL}/announcements"
-            r = requests.get(
-                url, headers={"Authorization": f"Bearer {self.token}"}, params=params
+    def _get_all_pages(self, url, params):
+        """
+        Follows Canvas `Link` header pagination and collects every page.
+
+        Args:
+            url (str): Initial Canvas API endpoint.
+            params (dict | list[tuple]): Query parameters for the first request;
+                subsequent `rel="next"` URLs already carry them.
+
+        Returns:
+            tuple[list[dict], bool]: Concatenated JSON objects from all pages,
+            and whether every page was read. Stops early, returning False, if
+            a page is not a JSON list (e.g. an error object).
+        """
+        results = []
+        while url:
+            r = _session.get(
+                url, headers=self._headers(), params=params, timeout=TIMEOUT
             )
-            data = r.json()
-            for a in data:
-                id = a.get("id")
-                if id in seen_ids:
-                    continue
-                seen_ids.add(id)
-                context = a.get("context_code")
-                if context is not None:
-                    id = int(context.split("_")[1])
-                    course_name = self.course_names.get(id)
-                    if course_name not in announcementsByCourse:
-                        announcementsByCourse[course_name] = []
-                    msg = a.get("message")
-                    posted_at = a.get("posted_at")
-                    if msg and posted_at:
-                        msg_text = self.html_to_string(msg)
-                        announcementsByCourse[course_name].append(
-                            {"posted_at": posted_at, "message": msg_text}
-                        )
-            for course_name, msgs in announcementsByCourse.items():
-                msgs.sort(key=lambda x: x["posted_at"])  # sort by posted_at ascending
-        return announcementsByCourse
+            data = orjson.loads(r.content)
+            if not isinstance(data, list):
+                return results, False
+            results.extend(data)
+
+            link = r.headers.get("Link", "")
+            match = _LINK_NEXT.search(link)
+            url = match.group(1) if match else None
+            params = None
+        return results, True
 
     def html_to_string(self, html):
         """
@@ -162,10 +236,13 @@ class AnnouncementFetcher:
         if not html:
             return ""
 
-        parsed = BeautifulSoup(html, "html.parser")
-        text = parsed.get_text(separator=" ", strip=True)
-        text = text.replace("\xa0", "").strip()
-        text = re.sub(r"\s+([.,!?;:])", r"\1", text)  # collapse multiple spaces
+        if "<" in html or "&" in html:
+            parsed = BeautifulSoup(html, "lxml")
+            text = parsed.get_text(separator=" ", strip=True)
+        else:
+            text = html.strip()  # plain text, nothing to parse
+        text = text.translate(_NBSP_TABLE).strip()
+        text = _PUNCT_RE.sub(r"\1", text)  # collapse multiple spaces
         return text
 
 
@@ -9,24 +9,55 @@ from dotenv import load_dotenv
 from .announcement_fetcher import AnnouncementFetcher
 from .announcement_parser import AnnouncementParser
 
+PACIFIC = ZoneInfo("America/Los_Angeles")
 
-def main(token):
+# one pass finds both grade-related terms and "midterm" mentions
+_FILTER_RE = re.compile(
+    r"(?P<bad>grades?|marks?|results?|scores?|passed?|failed?|review?)"
+    r"|(?P<mid>\bmidterm\b)",
+    re.IGNORECASE,
+)
+
+
+def _is_midterm_announcement(message):
+    """
+    Checks with a single regex scan whether an announcement is about a midterm.
+
+    Args:
+        message (str): Plain-text announcement body.
+
+    Returns:
+        bool: True if the message mentions "midterm" and none of the
+        grade-related terms; scanning stops at the first grade term.
+    """
+    mentions_midterm = False
+    for match in _FILTER_RE.finditer(message):
+        if match.lastgroup == "bad":
+            return False
+        mentions_midterm = True
+    return mentions_midterm
+
+
+def main(token, debug=False):
     """
     Orchestrates fetching Canvas announcements and extracting midterm dates.
 
     This function:
       1. Loads a Canvas API token (from parameter or .env file).
       2. Uses `AnnouncementFetcher` to retrieve announcements grouped by course.
-      3. Iterates over announcements, filtering those mentioning "midterm"
+      3. Iterates over announcements, keeping those mentioning "midterm"
          (but ignoring grade-related posts).
-      4. Calls `AnnouncementParser.extract_midterm_dates` to find an ISO date string.
-      5. Converts that date into a local Pacific time event dictionary and
+      4. Calls `AnnouncementParser.extract_midterm_dates_batch` once to find an
+         ISO date string for every course.
+      5. Converts each date into a local Pacific time event dictionary and
          appends it to a results list.
-      6. Saves all found midterm events to `midterm_dates.json`.
+      6. When `debug` is set, saves all found midterm events to `midterm_dates.json`.
 
     Args:
         token (str | None): Canvas API token. If `None`, loads from environment variable
             `CANVAS_TOKEN` in the .env file.
+        debug (bool): Also write the results to `midterm_dates.json` in the
+            working directory. Off by default so normal runs touch no disk.
 
     Returns:
         list[dict[str, str]]: A list of midterm event objects with keys:
@@ -37,7 +68,8 @@ def main(token):
             - `"end_date_time"`: End time one hour after start
 
     Raises:
-        FileNotFoundError: If the working directory is unwritable for JSON output.
+        FileNotFoundError: If `debug` is set and the working directory is
+            unwritable for JSON output.
         ValueError: If parsed dates are invalid ISO strings.
 
     Notes:
@@ -57,31 +89,30 @@ def main(token):
     # to be converted to final JSON obj
     output = []
 
-    for course_name, announcements in announcements.items():
-        # DEBUG
-        # print(f"Processing course: {course_name}\n\n")
-        midterm_date = None
-
-        for ann in announcements:
-            if re.search(r"\bmidterm\b", ann["message"], re.IGNORECASE):
-                if re.search(
-                    r"grades?|marks?|results?|scores?|passed?|failed?|review?",
-                    ann["message"],
-                    re.IGNORECASE,
-                ):
-                    continue  # ignore these announcements
+    # collect every candidate announcement so the parser makes a single model call
+    entries = []
+    for course_name, course_announcements in announcements.items():
+        for ann in course_announcements:
+            if not _is_midterm_announcement(ann["message"]):
+                continue  # no midterm, or a grade-related post
             # DEBUG
             # print(f"message: {ann['message']} time: {ann['posted_at']}\n")
-            utc_posted_at = datetime.fromisoformat(
-                ann["posted_at"].replace("Z", "+00:00")
+            # fromisoformat reads Canvas's trailing "Z" directly (Python 3.11+)
+            pst_posted_at = datetime.fromisoformat(ann["posted_at"]).astimezone(PACIFIC)
+            entries.append(
+                {
+                    "course": course_name,
+                    "posted_at": pst_posted_at.isoformat(),
+                    "message": ann["message"],
+                }
             )
-            pst_posted_at = utc_posted_at.astimezone(ZoneInfo("America/Los_Angeles"))
-            date = AnnouncementParser.extract_midterm_dates(
-                ann["message"], posted_at=pst_posted_at.isoformat()
-            )
-            if date:
-                midterm_date = date
-                break  # stop after first found
+
+    midterm_dates = (
+        AnnouncementParser.extract_midterm_dates_batch(entries) if entries else {}
+    )
+
+    for course_name in announcements:
+        midterm_date = midterm_dates.get(course_name)
 
         if midterm_date:
             dt = datetime.fromisoformat(midterm_date)
@@ -105,9 +136,9 @@ def main(token):
             }
             output.append(event)
 
-    # DEBUG save as JSON file
-    with open("midterm_dates.json", "w") as f:
-        json.dump(output, f, indent=4)
+    if debug:
+        with open("midterm_dates.json", "w") as f:
+            json.dump(output, f)
 
     # DEBUG
     # print(json.dumps(output, indent=4))
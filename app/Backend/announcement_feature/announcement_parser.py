@@ -1,8 +1,24 @@
+import json
 import os
 import re
+from functools import lru_cache
 
 from openai import OpenAI
 
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_MIDTERM_RE = re.compile(r"\bmidterm\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _get_client():
+    """
+    Returns the shared OpenAI client.
+
+    Built on first use (so importing does not require OPENAI_API_KEY) and then
+    reused, keeping its HTTP connection pool to api.openai.com alive across calls.
+    """
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
 
 class AnnouncementParser:
     """
@@ -13,7 +29,8 @@ class AnnouncementParser:
     date or date-time values in ISO 8601 format.
 
     This helper is meant to be stateless — all logic resides in the static
-    method `extract_midterm_dates`.
+    methods `extract_midterm_dates` (one announcement) and
+    `extract_midterm_dates_batch` (every course in a single model call).
     """
 
     @staticmethod
@@ -36,19 +53,21 @@ class AnnouncementParser:
 
         Notes:
             * Sentences are split on punctuation boundaries using
-              `re.split(r'(?<=[.!?])\\s+')`.
+              `_SENT_SPLIT` (`(?<=[.!?])\\s+`).
             * If no sentence includes "midterm" (case-insensitive),
               the function returns `None` without calling the API.
             * The OpenAI model (gpt-4o-mini) is prompted to output only ISO-formatted dates.
         """
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # cheap whole-text check before splitting into sentences
+        if not _MIDTERM_RE.search(announcements):
+            return None
+
+        client = _get_client()
         # keep only lines mentioning "midterm"
-        sentences = re.split(r"(?<=[.!?])\s+", announcements)
+        sentences = _SENT_SPLIT.split(announcements)
 
         # filter sentences w/ midterm
-        midterm_sentences = [
-            s.strip() for s in sentences if re.search(r"\bmidterm\b", s, re.IGNORECASE)
-        ]
+        midterm_sentences = [s.strip() for s in sentences if _MIDTERM_RE.search(s)]
 
         if not midterm_sentences:
             return None
@@ -73,3 +92,94 @@ class AnnouncementParser:
         )
 
         return response.output_text.strip()
+
+    @staticmethod
+    def extract_midterm_dates_batch(entries: list[dict[str, str]]):
+        """
+        Extracts the first midterm date for every course using one OpenAI request.
+
+        Midterm sentences from all announcements are tagged with their course and
+        sent together; the model answers with a JSON object keyed by course. If
+        that answer is not a JSON object, or leaves out a course, the affected
+        courses fall back to `extract_midterm_dates` on each of their entries.
+
+        Args:
+            entries (list[dict[str, str]]): Announcements to scan, in posting order,
+                each with keys `"course"`, `"posted_at"` (ISO timestamp passed to
+                the model for context) and `"message"` (plain text).
+
+        Returns:
+            dict[str, str | None]: Maps each course that had at least one midterm
+            sentence to a stripped ISO 8601 date or date-time string, or `None`
+            if the model found no date. Empty if no entry mentions "midterm",
+            in which case the API is not called.
+
+        Raises:
+            openai.OpenAIError: If the API call fails.
+        """
+        lines = []
+        courses = {}  # course -> its midterm entries, in posting order
+        for entry in entries:
+            if not _MIDTERM_RE.search(entry["message"]):
+                continue
+            sentences = _SENT_SPLIT.split(entry["message"])
+            for s in sentences:
+                if _MIDTERM_RE.search(s):
+                    lines.append(
+                        f"[{entry['course']}] Posted at {entry['posted_at']}: {s.strip()}"
+                    )
+            courses.setdefault(entry["course"], []).append(entry)
+
+        if not lines:
+            return {}
+
+        prompt = (
+            "Extract the first midterm date or date-time mentioned for each course below.\n"
+            "Each line starts with the course name in square brackets.\n"
+            "Respond with a JSON object mapping every course name, exactly as written, "
+            "to an ISO 8601 string (YYYY-MM-DD or YYYY-MM-DDTHH:MM), "
+            "or null if no date is found for that course.\n"
+            "Do not write explanations or text.\n\n" + "\n".join(lines)
+        )
+
+        client = _get_client()
+        response = client.responses.create(
+            model="gpt-4o-mini",
+            input=prompt,
+            text={"format": {"type": "json_object"}},
+            max_output_tokens=250 + 50 * len(courses),
+        )
+
+        try:
+            dates = json.loads(response.output_text)
+        except json.JSONDecodeError:
+            dates = None
+        if not isinstance(dates, dict):
+            dates = {}
+
+        result = {}
+        for course, course_entries in courses.items():
+            try:
+                date = dates[course]
+            except KeyError:
+                # course name not echoed back; ask about it on its own
+                result[course] = AnnouncementParser._first_midterm_date(course_entries)
+                continue
+            if isinstance(date, str) and date.strip():
+                result[course] = date.strip()
+            else:
+                result[course] = None
+        return result
+
+    @staticmethod
+    def _first_midterm_date(entries: list[dict[str, str]]):
+        """
+        Returns the first date `extract_midterm_dates` finds in `entries`, or None.
+        """
+        for entry in entries:
+            date = AnnouncementParser.extract_midterm_dates(
+                entry["message"], entry["posted_at"]
+            )
+            if date:
+                return date
+        return None
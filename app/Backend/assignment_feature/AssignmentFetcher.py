@@ -11,14 +11,34 @@ This module:
   Canvas IDs, original class names, and assignment lists.
 """
 
-import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from dotenv import load_dotenv
-import requests
+import orjson
 import os
 
+try: # relative import if run as module
+    from http_session import make_session
+except ModuleNotFoundError: # absolute import if run as script
+    from Backend.http_session import make_session
+
+try: # relative import if run as module
+    import canvas_cache
+except ModuleNotFoundError: # absolute import if run as script
+    from Backend import canvas_cache
+
+TIMEOUT = 10  # seconds per Canvas request
+MAX_WORKERS = 8  # concurrent per-course assignment requests
+
+_NUM_RE = re.compile(r"\d+")
+_LINK_NEXT = re.compile(r'<([^>]+)>\s*;\s*rel="next"')
+
+# reused for every Canvas call so pagination and per-course requests share
+# pooled keep-alive connections instead of a new TLS handshake each time
+_session = make_session()
+
 # Info Gathering
 # -------------------------
 
@@ -29,7 +49,7 @@ def mapCourses(token: str) -> str:
     For each current-term Canvas course:
     - Simplifies the course name (e.g., "CPEN_V 221 101" → "CPEN 221").
     - Aggregates all Canvas course IDs that map to the same simplified code.
-    - Fetches upcoming assignments for each course ID.
+    - Fetches upcoming assignments for each course ID concurrently.
 
     Args:
         token: Canvas API access token for the current user.
@@ -48,24 +68,34 @@ def mapCourses(token: str) -> str:
               ...
             }
     """
-    course_map.clear()
-    getClasses(token)
+    names, ids = getClassesInfo(token)
 
-    for name, id in zip(classesValid, classesIdValid):
+    course_map: dict = {}
+    pending = []
+    for name, id in zip(names, ids):
         key = simplify_name(name)
 
         if key is None:
             continue
 
-        if key not in course_map:
-            course_map[key] = {"ids": [], "classes": [], "assignments": []}
+        entry = course_map.setdefault(
+            key, {"ids": [], "classes": [], "assignments": []}
+        )
+
+        if id not in entry["ids"]:
+            entry["ids"].append(id)
+            entry["classes"].append(name)
+            pending.append((key, id))
 
-        if id not in course_map[key]["ids"]:
-            course_map[key]["ids"].append(id)
-            course_map[key]["classes"].append(name)
-            course_map[key]["assignments"].append(getAssignmentsClass(id, token))
+    # each course's assignments are an independent request, fetch them together
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda id: getAssignmentsClass(id, token), [id for _, id in pending]
+        )
+        for (key, _), assignments in zip(pending, results):
+            course_map[key]["assignments"].append(assignments)
 
-    data = json.dumps(course_map, indent=2)
+    data = orjson.dumps(course_map, option=orjson.OPT_INDENT_2).decode()
 
     return data
 
@@ -88,12 +118,12 @@ def get_all_pages(url: str, headers: dict, params: dict | None = None) -> list:
 
     all_data = []
     while url:
-        r = requests.get(url, headers=headers, params=params)
+        r = _session.get(url, headers=headers, params=params, timeout=TIMEOUT)
         r.raise_for_status()
-        all_data.extend(r.json())
+        all_data.extend(orjson.loads(r.content))
 
         link = r.headers.get("Link", "")
-        match = re.search(r'<([^>]+)>\s*;\s*rel="next"', link)
+        match = _LINK_NEXT.search(link)
         url = match.group(1) if match else None
 
         params = None
@@ -101,14 +131,6 @@ def get_all_pages(url: str, headers: dict, params: dict | None = None) -> list:
 
 load_dotenv()
 
-classesValid: list[str] = []
-classNames: list[str] = []
-classesIdValid: list[str] = []
-classesAssignmentsValid: list[str] = []
-NoDueDate: list[str] = []
-course_map: dict = {}
-classes: set = set()
-
 
 # gets the info from the requested URL
 def requestUrl(requestScope: str, accessToken: str) -> list:
@@ -136,24 +158,28 @@ def requestUrl(requestScope: str, accessToken: str) -> list:
 
 
 # gets all the classes a student is enrolled in on Canvas
-def getClasses(token: str) -> list[str]:
+def getClassesInfo(
+    token: str, force_refresh: bool = False
+) -> tuple[list[str], list[int]]:
     """
-    Populate global course lists with all current-term Canvas classes.
+    Fetch the raw names and IDs of all current-term Canvas classes.
 
-    Fetches all courses for the user, filters them to the current term,
-    and stores names and IDs into `classesValid` and `classesIdValid`.
+    A non-empty result is cached on disk per token (see `canvas_cache`) until
+    it expires or the current term ends.
 
     Args:
         token: Canvas API access token.
+        force_refresh: Ignore the on-disk cache and refetch.
 
     Returns:
-        list[str]: The list of valid course names for the current term.
+        tuple[list[str], list[int]]: Canvas course names and the matching
+        course IDs, in the same order.
     """
 
-    classesValid.clear()
-    classesIdValid.clear()
-    classNames.clear()
-    classes.clear()
+    if not force_refresh:
+        cached = canvas_cache.load_cache(token, "classes")
+        if cached is not None:
+            return cached["names"], cached["ids"]
 
     requestScope = (
         "api/v1/users/self/courses?per_page=100&enrollment_state[]="
@@ -163,18 +189,45 @@ def getClasses(token: str) -> list[str]:
 
     classesInfo = requestUrl(requestScope, token)
 
+    names: list[str] = []
+    ids: list[int] = []
+    term_end = None
+    now = datetime.now(timezone.utc)
     for classInfo in classesInfo:
         if classInfo.get("name") is not None:
-            if is_current_term(classInfo.get("term")):
-                classesValid.append(classInfo.get("name"))
-                classesIdValid.append(classInfo.get("id"))
+            term = classInfo.get("term")
+            if is_current_term(term, now):
+                names.append(classInfo.get("name"))
+                ids.append(classInfo.get("id"))
+                _, end = canvas_cache.parse_bounds(term["start_at"], term["end_at"])
+                end = end.timestamp()
+                term_end = end if term_end is None else min(term_end, end)
+
+    # an empty listing is not cached, so a transient Canvas failure is retried
+    if ids:
+        canvas_cache.store_cache(
+            token, "classes", {"names": names, "ids": ids}, term_end
+        )
+    return names, ids
 
-    for e in classesValid:
-        classes.add(simplify_name(e))
 
-    classNames.extend(x for x in classes if x is not None)
+def getClasses(token: str) -> list[str]:
+    """
+    Return the simplified names of all current-term Canvas classes.
 
-    return classNames
+    Args:
+        token: Canvas API access token.
+
+    Returns:
+        list[str]: Unique simplified course names (see `simplify_name`),
+        in the order Canvas returned them.
+    """
+
+    names, _ = getClassesInfo(token)
+
+    # dict keys dedupe while keeping first-seen order
+    simplified = dict.fromkeys(simplify_name(name) for name in names)
+    return [name for name in simplified if name is not None]
 
 
 def is_due_in_future(due: str) -> bool:
@@ -193,16 +246,18 @@ def is_due_in_future(due: str) -> bool:
     return due_dt > now
 
 
-def is_current_term(term: str | None) -> bool:
+def is_current_term(term: str | None, now: datetime | None = None) -> bool:
     """
     Determine whether the current time falls within a Canvas term.
 
     Args:
         term: Dictionary containing at least `start_at` and `end_at` keys
             with ISO 8601 timestamps, or None.
+        now: Aware reference time; defaults to the current UTC time. Pass it
+            in when checking many courses.
 
     Returns:
-        bool: True if the current UTC time is between start_at and end_at
+        bool: True if `now` is between start_at and end_at
         (inclusive), False otherwise or if dates are missing.
     """
         
@@ -210,10 +265,10 @@ def is_current_term(term: str | None) -> bool:
     end = term.get("end_at")
     if not start or not end:
         return False
-    now = datetime.now(timezone.utc)
+    if now is None:
+        now = datetime.now(timezone.utc)
 
-    start = datetime.fromisoformat(start.replace("Z", "+00:00"))
-    end = datetime.fromisoformat(end.replace("Z", "+00:00"))
+    start, end = canvas_cache.parse_bounds(start, end)
     return start <= now <= end
 
 
@@ -242,7 +297,7 @@ def simplify_name(name: str) -> str | None:
     if len(parts) < 2:
         return None
 
-    m = re.match(r"\d+", parts[1])
+    m = _NUM_RE.match(parts[1])
     if not m:
         return None
 
@@ -263,7 +318,7 @@ def getAssignmentsClass(classId: int, token: str) -> list[list[str]]:
     Fetch upcoming assignments for a specific Canvas course.
 
     Assignments with a non-null `due_at` in the future are included in the
-    returned list. Others are recorded in `NoDueDate`.
+    returned list. Others are skipped.
 
     Args:
         classId: Canvas course ID.
@@ -281,28 +336,21 @@ def getAssignmentsClass(classId: int, token: str) -> list[list[str]]:
     assignmentsInfo = requestUrl(requestScope, token)
 
     for assignmentInfo in assignmentsInfo:
-        if assignmentInfo.get("due_at") is not None and is_due_in_future(
-            assignmentInfo.get("due_at")
-        ):
-            time = assignmentInfo.get("due_at")
-            time = time.rstrip("Z")
-            date_part, time_part = time.split("T")
-            date_part = date_part.replace("-", "/")
+        due = assignmentInfo.get("due_at")
+        if due is not None and is_due_in_future(due):
+            # Canvas due_at is always "YYYY-MM-DDTHH:MM:SSZ"
+            date_part = due[0:4] + "/" + due[5:7] + "/" + due[8:10]
+            time_part = due[11:19]
 
             assignmentsClassNameDue.append(
                 [
                     assignmentInfo.get("name"),
                     date_part,
                     time_part,
-                    assignmentInfo.get("due_at"),
+                    due,
                 ]
             )
 
-        else:
-            NoDueDate.append(
-                [assignmentInfo.get("name"), assignmentInfo.get("course_Id")]
-            )
-
     return assignmentsClassNameDue
 
 if __name__ == "__main__":
@@ -0,0 +1,69 @@
+"""
+On-disk cache for per-token Canvas course lists, shared by the fetchers.
+
+Entries live under `CACHE_DIR`, one directory per (hashed) token, and expire
+after `CACHE_TTL` seconds or when the term they were cached for ends.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import orjson
+
+CACHE_DIR = Path(os.getenv("NOTIFLOW_CACHE_DIR", Path.home() / ".notiflow-cache"))
+CACHE_TTL = 6 * 3600  # seconds before a cached course list is refetched
+
+
+@lru_cache(maxsize=32)
+def parse_bounds(start, end):
+    """Parses a term's ISO start/end once; most courses share the same term."""
+    return datetime.fromisoformat(start), datetime.fromisoformat(end)
+
+
+def _cache_path(token, name):
+    """Returns the cache file for `name`, keyed by a hash of the token."""
+    key = hashlib.sha256(token.encode()).hexdigest()[:16]
+    return CACHE_DIR / key / f"{name}.json"
+
+
+def load_cache(token, name):
+    """
+    Reads a cached value written by `store_cache`.
+
+    Returns:
+        The cached data, or None if missing, unreadable, older than `CACHE_TTL`,
+        or past the end of the term it was cached for.
+    """
+    try:
+        with open(_cache_path(token, name), "rb") as f:
+            cached = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    now = time.time()
+    if now - cached["ts"] >= CACHE_TTL:
+        return None
+    if cached["term_end"] is not None and now >= cached["term_end"]:
+        return None
+    return cached["data"]
+
+
+def store_cache(token, name, data, term_end):
+    """
+    Writes `data` to the on-disk cache. Failures are ignored, caching is best effort.
+
+    Args:
+        term_end (float | None): POSIX time at which the cached term ends.
+    """
+    path = _cache_path(token, name)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(
+                orjson.dumps({"ts": time.time(), "term_end": term_end, "data": data})
+            )
+    except OSError:
+        pass
@@ -1,6 +1,19 @@
-from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from lxml import html
+
+try: # relative import if run as module
+    from http_session import make_session
+except ModuleNotFoundError: # absolute import if run as script
+    from Backend.http_session import make_session
+
+TIMEOUT = 10  # seconds per exam schedule request
+MAX_WORKERS = 8  # concurrent course lookups
+DATETIME_FORMAT = "%a %b %d %Y | %H:%M pm"  # e.g. "Mon Apr 21 2025 | 12:00 pm"
+EXAM_MINUTES = 150  # standard 2.5-hour exam
+
+# one pooled keep-alive session for every course lookup
+_session = make_session()
 
 
 class FinalExamFetcher:
@@ -41,8 +54,11 @@ class FinalExamFetcher:
             "course": course,
         }
 
-        response = requests.get(
-            FinalExamFetcher.url, params=params, headers=FinalExamFetcher.headers
+        response = _session.get(
+            FinalExamFetcher.url,
+            params=params,
+            headers=FinalExamFetcher.headers,
+            timeout=TIMEOUT,
         )
 
         if response.status_code == 200:
@@ -54,39 +70,44 @@ class FinalExamFetcher:
                     html_content = item["data"]
                     break
 
-            # html parsing with beautifulsoup
+            # html parsing with lxml, the payload has a fixed class layout
             if html_content:
-                soup = BeautifulSoup(html_content, "html.parser")
+                root = html.fromstring(html_content)
 
-                exam_div = soup.find("div", class_="exam-content")
+                exam_div = FinalExamFetcher._first_by_class(root, "exam-content")
 
-                if exam_div:
-                    date_time = exam_div.find("div", class_="datetime").get_text(
-                        strip=True
-                    )
+                if exam_div is not None:
+                    date_time = FinalExamFetcher._first_by_class(
+                        exam_div, "datetime"
+                    ).text_content().strip()
 
                     locations = []
-                    loc_divs = exam_div.find_all("div", class_="location")
+                    loc_divs = exam_div.find_class("location")
 
                     for loc in loc_divs:
-                        split = loc.find("div", class_="split")
-                        building = loc.find("div", class_="location-url")
+                        split = FinalExamFetcher._first_by_class(loc, "split")
+                        building = FinalExamFetcher._first_by_class(loc, "location-url")
 
-                        split_text = split.get_text(strip=True) if split else "All"
+                        split_text = (
+                            split.text_content().strip() if split is not None else "All"
+                        )
                         building_text = (
-                            building.get_text(strip=True) if building else "Unknown"
+                            building.text_content().strip()
+                            if building is not None
+                            else "Unknown"
                         )
                         locations.append(f"{split_text}: {building_text}")
 
                     separator = ", "
                     locationString = separator.join(locations)
 
-                    start_time = FinalExamFetcher._time_parse(date_time)
+                    exam_dt = FinalExamFetcher._parse_datetime(date_time)
+                    start_time = exam_dt.strftime("%H:%M:00")
 
                     final = {
                         "course": course,
                         "event_type": "Final Exam",
-                        "date": FinalExamFetcher._date_parse(date_time),
+                        "date": exam_dt.strftime("%Y/%m/%d"),
                         "begin_date_time": start_time,
                         "end_date_time": FinalExamFetcher._end_time(start_time),
                         "location": locationString,
@@ -105,8 +126,9 @@ class FinalExamFetcher:
         """
         Retrieves final exam information for a list of courses.
 
-        Iterates through the provided list of course codes, fetching data for each
-        individually. Invalid courses or failed requests are excluded from the result.
+        Fetches every distinct course exactly once, concurrently, and keeps the
+        results in input order. Invalid courses or failed requests are excluded
+        from the result.
 
         Args:
             courses (list[str]): A list of course identifiers.
@@ -116,11 +138,39 @@ class FinalExamFetcher:
             list[dict]: A list of dictionaries, where each dictionary contains the
                 final exam information for a successfully fetched course.
         """
-        finalsList = []
-        for course in courses:
-            if FinalExamFetcher.get_final(course) is not None:
-                finalsList.append(FinalExamFetcher.get_final(course))
-        return finalsList
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            # a course listed twice (e.g. two sections) is only requested once
+            finalsList = list(
+                executor.map(FinalExamFetcher.get_final, dict.fromkeys(courses))
+            )
+        return [final for final in finalsList if final is not None]
+
+    def _first_by_class(element, class_name):
+        """
+        Returns the first element (the given one or a descendant) with a CSS class.
+
+        Args:
+            element (lxml.html.HtmlElement): The element to search from.
+            class_name (str): The class to match, e.g. "exam-content".
+
+        Returns:
+            lxml.html.HtmlElement: The first matching element.
+            None: If no element carries the class.
+        """
+        matches = element.find_class(class_name)
+        return matches[0] if matches else None
+
+    def _parse_datetime(date_time):
+        """
+        Parses a raw datetime string scraped from the HTML.
+
+        Args:
+            date_time (str): Expected format: "%a %b %d %Y | %H:%M pm"
+
+        Returns:
+            datetime: The parsed (naive) exam start.
+        """
+        return datetime.strptime(date_time, DATETIME_FORMAT)
 
     def _date_parse(date_time):
         """
@@ -133,10 +183,7 @@ class FinalExamFetcher:
         Returns:
             str: The formatted date string in "%Y/%m/%d" format.
         """
-        format_string = "%a %b %d %Y | %H:%M pm"
-        format_out = "%Y/%m/%d"
-        date_time_obj = datetime.strptime(date_time, format_string)
-        return date_time_obj.strftime(format_out)
+        return FinalExamFetcher._parse_datetime(date_time).strftime("%Y/%m/%d")
 
     def _time_parse(date_time):
         """
@@ -149,10 +196,7 @@ class FinalExamFetcher:
         Returns:
             str: The formatted time string in "%H:%M:00" format.
         """
-        format_string = "%a %b %d %Y | %H:%M pm"
-        format_out = "%H:%M:00"
-        date_time_obj = datetime.strptime(date_time, format_string)
-        return date_time_obj.strftime(format_out)
+        return FinalExamFetcher._parse_datetime(date_time).strftime("%H:%M:00")
 
     def _end_time(start_time):
         """
@@ -160,15 +204,16 @@ class FinalExamFetcher:
         
         Args:
             start_time (str): The exam start time.
-                Expected format: "%H:%M:00"
+                Expected format: "%H:%M:%S"
 
         Returns:
-            str: The calculated end time formatted as "%H:%M:00".
+            str: The calculated end time formatted as "%H:%M:%S", wrapping past midnight.
         """
-        return datetime.strftime(
-            datetime.strptime(start_time, "%H:%M:00") + timedelta(hours=2, minutes=30),
-            "%H:%M:00",
-        )
+        hours, minutes, seconds = map(int, start_time.split(":"))
+        end = (hours * 3600 + minutes * 60 + seconds + EXAM_MINUTES * 60) % 86400
+        hours, rest = divmod(end, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
 # debugging
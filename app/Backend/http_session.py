@@ -0,0 +1,37 @@
+"""
+Pooled HTTP session shared by the Canvas and exam schedule fetchers.
+
+Named `http_session` rather than `http` so it cannot shadow the standard
+library module when the Backend directory is on `sys.path`.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_session():
+    """
+    Builds a keep-alive session that retries transient failures.
+
+    Requests to https:// hosts share a connection pool, so repeated calls skip
+    the TLS handshake; 429 and 5xx gateway errors are retried with backoff.
+
+    Returns:
+        requests.Session: A new session with the retrying adapter mounted.
+    """
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        ),
+    )
+    return session
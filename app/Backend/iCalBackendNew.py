@@ -1,9 +1,15 @@
-import json
-from datetime import datetime, timezone, date
+import logging
+import mmap
+import os
+import re
+from datetime import datetime, timedelta, timezone, date
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 import icalendar
-import pytz
+import orjson
+from dateutil.rrule import rrulestr
+import xxhash
 
 try:
     from .assignment_feature.AssignmentFetcher import mapCourses
@@ -11,6 +17,265 @@ except ImportError:
     from assignment_feature.AssignmentFetcher import mapCourses
 
 
+log = logging.getLogger(__name__)
+
+# TEXT escapes (RFC 5545 3.3.11) that can appear in a serialized UID
+_TEXT_UNESCAPE = re.compile(rb"\\([\\;,nN])")
+# closing line of the calendar; appends go just before it
+_TRAILER = b"END:VCALENDAR\r\n"
+
+
+def _scan_uids(path):
+    """
+    Collects every UID in an .ics file without building the calendar.
+
+    The file is memory-mapped and searched for UID lines directly; folded
+    continuation lines (starting with a space or tab) are joined back on.
+
+    Args:
+        path (Path): The .ics file to scan.
+
+    Returns:
+        set[int]: The `_uid_key` of every component UID in the file.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set()  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _collect_uids(mm)
+
+
+def _collect_uids(buf):
+    """
+    Collects the `_uid_key` of every UID line in serialized iCalendar data.
+
+    Args:
+        buf (bytes | mmap.mmap): Serialized components.
+
+    Returns:
+        set[int]: The `_uid_key` of every component UID in `buf`.
+    """
+    uids = set()
+    pos = buf.find(b"\nUID:")
+    while pos != -1:
+        raw, pos = _read_unfolded(buf, pos + 5)
+        uids.add(xxhash.xxh3_64_intdigest(_unescape_uid(raw)))
+        pos = buf.find(b"\nUID:", pos)
+    return uids
+
+
+def _read_unfolded(mm, start):
+    """
+    Reads one content-line value starting at `start`, following folds.
+
+    Returns:
+        tuple[bytes, int]: The unfolded value and the offset of its final newline.
+    """
+    parts = []
+    while True:
+        end = mm.find(b"\n", start)
+        if end == -1:
+            end = len(mm)
+        parts.append(mm[start:end].rstrip(b"\r"))
+        if mm[end + 1:end + 2] not in (b" ", b"\t"):
+            return b"".join(parts), end
+        start = end + 2
+
+
+def _file_sig(path):
+    """
+    Returns `(st_mtime_ns, st_size)` for `path`, or None if it does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _unescape_uid(raw):
+    """Undoes TEXT escaping in a raw UID value."""
+    return _TEXT_UNESCAPE.sub(
+        lambda m: b"\n" if m.group(1) in b"nN" else m.group(1), raw
+    )
+
+
+def _uid_key(uid):
+    """
+    Returns the 64-bit hash stored in `ICalHandler.existing_uids` for a UID.
+
+    Keeping ints instead of the ~70 character UID strings makes the set far
+    smaller; a collision would need ~2**32 events to become likely.
+    """
+    return xxhash.xxh3_64_intdigest(uid.encode())
+
+
+# UID sanitizing in one pass: spaces become underscores, slashes are dropped
+_UID_TRANSLATE = str.maketrans({" ": "_", "/": None})
+
+# frontend day keys -> RRULE BYDAY codes, in week order
+_DAY_MAP = (
+    ("M", "MO"),
+    ("Tu", "TU"),
+    ("W", "WE"),
+    ("Th", "TH"),
+    ("F", "FR"),
+    ("Sa", "SA"),
+    ("Su", "SU"),
+)
+
+_TZID = "America/Vancouver"
+_ICAL_DT = "%Y%m%dT%H%M%S"
+_TZ = ZoneInfo(_TZID)
+# calendars live next to this module; resolved once rather than per handler
+_ICS_DIR = Path(__file__).resolve().parent
+_UTC = timezone.utc
+# how far a series with no usable end is expanded (about one term)
+_DEFAULT_SPAN = timedelta(weeks=16)
+
+# set NOTIFLOW_DEBUG to cross-check existing_uids against a full parse of the
+# .ics after loading and saving (slow; never walk the calendar otherwise)
+_DEBUG_CHECK = bool(os.environ.get("NOTIFLOW_DEBUG"))
+
+
+def _escape_text(value):
+    """Escapes a TEXT property value (RFC 5545 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """
+    Encodes one content line, folding it at 75 octets (RFC 5545 3.1).
+
+    Folds never split a multi-byte UTF-8 character.
+    """
+    raw = line.encode()
+    if len(raw) <= 75:
+        return raw + b"\r\n"
+    parts = []
+    start, limit = 0, 75
+    while len(raw) - start > limit:
+        cut = start + limit
+        while raw[cut] & 0xC0 == 0x80:  # continuation byte
+            cut -= 1
+        parts.append(raw[start:cut])
+        start, limit = cut, 74  # continuation lines lead with a space
+    parts.append(raw[start:])
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def _format_rrule(rrule):
+    """Renders an rrule dict from `_prepare_event` as an RRULE value."""
+    parts = [f"FREQ={rrule['FREQ']}"]
+    if "UNTIL" in rrule:
+        parts.append(f"UNTIL={rrule['UNTIL'].strftime(_ICAL_DT)}")
+    if "INTERVAL" in rrule:
+        parts.append(f"INTERVAL={rrule['INTERVAL']}")
+    if "BYDAY" in rrule:
+        by_day = rrule["BYDAY"]
+        parts.append("BYDAY=" + (by_day if isinstance(by_day, str) else ",".join(by_day)))
+    return ";".join(parts)
+
+
+def _format_vevent(
+    course,
+    event_type,
+    dt_start,
+    dt_end,
+    uid,
+    location="",
+    rrule_str="",
+    exdates=(),
+    dtstamp=None,
+):
+    """
+    Serializes one VEVENT straight to iCalendar bytes.
+
+    Produces the same properties as `ICalHandler.create_event_object` without
+    going through icalendar's Event/property machinery.
+
+    Args:
+        course (str): The course identifier.
+        event_type (str): The type of event (e.g., "Lecture").
+        dt_start (datetime): Local start time.
+        dt_end (datetime): Local end time.
+        uid (str): The event UID.
+        location (str, optional): Event location.
+        rrule_str (str, optional): RRULE value, see `_format_rrule`.
+        exdates (Iterable[datetime], optional): Local exception start times.
+        dtstamp (datetime, optional): UTC creation stamp; defaults to now.
+
+    Returns:
+        bytes: The CRLF-terminated VEVENT block.
+    """
+    if dtstamp is None:
+        dtstamp = datetime.now(timezone.utc)
+    summary = f"{course} - {event_type}"
+    if location:
+        summary += f" - {location}"
+    lines = [
+        "BEGIN:VEVENT",
+        "SUMMARY:" + _escape_text(summary),
+        f"DTSTART;TZID={_TZID}:{dt_start.strftime(_ICAL_DT)}",
+        f"DTEND;TZID={_TZID}:{dt_end.strftime(_ICAL_DT)}",
+        f"DTSTAMP:{dtstamp.strftime(_ICAL_DT)}Z",
+        "UID:" + _escape_text(uid),
+    ]
+    if rrule_str:
+        lines.append("RRULE:" + rrule_str)
+    for ex_dt in exdates:
+        lines.append(f"EXDATE;TZID={_TZID}:{ex_dt.strftime(_ICAL_DT)}")
+    lines.append("DESCRIPTION:" + _escape_text(f"Entry for {course} {event_type}"))
+    if location:
+        lines.append("LOCATION:" + _escape_text(location))
+    lines.append("END:VEVENT")
+    return b"".join(_fold(line) for line in lines)
+
+
+def _write_ical(calendar, fp, extra=b""):
+    """
+    Writes a calendar to a binary file object one component at a time.
+
+    Produces the same bytes as `calendar.to_ical()` (with `extra` inserted
+    before END:VCALENDAR) without building the whole file in memory.
+
+    Args:
+        calendar (icalendar.Calendar): The calendar to write.
+        fp (BinaryIO): Destination opened for binary writing.
+        extra (bytes, optional): Already serialized components to append.
+    """
+    # serialize the calendar's own properties without its subcomponents
+    shell = calendar.__class__()
+    shell.update(calendar)
+    header = shell.to_ical()
+    end = header.rfind(b"END:VCALENDAR")
+    fp.write(header[:end])
+    for component in calendar.subcomponents:
+        fp.write(component.to_ical())
+    fp.write(extra)
+    fp.write(header[end:])
+
+
+def _occurrence_uid(uid, index):
+    """Returns the UID of one pre-expanded occurrence of a recurring event."""
+    local, at, domain = uid.partition("@")
+    return f"{local}-{index}{at}{domain}"
+
+
+def _format_fields(fields, dtstamp=None):
+    """Serializes a tuple from `ICalHandler._event_fields` with `_format_vevent`."""
+    course, event_type, dt_start, dt_end, uid, location, rrule, exdates = fields
+    rrule_str = _format_rrule(rrule) if rrule else ""
+    return _format_vevent(
+        course, event_type, dt_start, dt_end, uid, location, rrule_str, exdates, dtstamp
+    )
+
+
 # Mocking the fetcher return for demonstration purposes
 # In our real project, you would import your actual modules here
 # from final_exam_feature.FinalExam import FinalExamFetcher as ff
@@ -29,8 +294,16 @@ class ICalHandler:
         tz (datetime.tzinfo): The timezone object (America/Vancouver).
         token (str): User authentication token.
         ics_path (Path): The file path where the calendar is stored.
-        calendar (icalendar.Calendar): The internal calendar object.
-        existing_uids (set): A tracking set of UIDs to prevent duplicate entries.
+        calendar (icalendar.Calendar | None): The internal calendar object. For an
+            existing file this stays None; new components are appended to the
+            file on save without parsing it (see `save_calendar`).
+        existing_uids (set[int]): `_uid_key` hashes of known UIDs, used to
+            prevent duplicate entries. This is the authoritative UID index: it
+            holds every UID in the file (plus any added but not yet saved) and
+            is kept up to date as components are added, so the calendar is
+            never walked to answer "does this event exist".
+        _new_components (list[bytes]): Serialized VEVENTs/VTODOs added since the
+            last save.
     """
     term_end_date = "2025/12/7"
 
@@ -38,36 +311,83 @@ class ICalHandler:
         """
         Initializes the ICalHandler.
 
-        Attempts to load an existing calendar file from the disk. If the file
-        does not exist or is corrupted, a new calendar object is created.
+        If a calendar file exists, only its UIDs are scanned here; it is only
+        fully parsed if it turns out to be unusable for appending on save. If the
+        file does not exist or cannot be read, a new calendar object is created.
 
         Args:
             token (str): The user's authentication token.
             filename (str, optional): The name of the .ics file. Defaults to 'calendar.ics'.
         """
-        self.tz = pytz.timezone("America/Vancouver")
+        self.tz = _TZ
         self.token = token
 
-        self.curr_path = Path(__file__).resolve()
-        self.notiflow_path = self.curr_path.parent
-        self.ics_path = self.notiflow_path / filename
+        self.ics_path = _ICS_DIR / filename
 
         self.calendar = None
         self.existing_uids = set()
+        self._new_components = []
+        # taken before the scan, so a write racing with it shows up as stale
+        self._file_sig = _file_sig(self.ics_path)
 
         if self.ics_path.is_file():
-            print(f"Loading existing calendar from {self.ics_path}")
+            log.debug("Loading existing calendar from %s", self.ics_path)
             try:
-                with open(self.ics_path, "rb") as f:
-                    self.calendar = icalendar.Calendar.from_ical(f.read())
-                    for component in self.calendar.walk():
-                        if component.name == "VEVENT":
-                            self.existing_uids.add(component.get("uid"))
+                self.existing_uids = _scan_uids(self.ics_path)
             except Exception as e:
-                print(f"Error reading file, creating new: {e}")
+                log.warning("Error reading file, creating new: %s", e)
                 self._create_new_calendar()
         else:
-            print("Creating new calendar file.")
+            log.debug("Creating new calendar file.")
+            self._create_new_calendar()
+
+        if _DEBUG_CHECK and self.calendar is None:
+            self._check_uid_index()
+
+    def is_stale(self):
+        """
+        Checks whether the .ics file changed since this handler last read or
+        wrote it, e.g. through another handler; `existing_uids` is then out of
+        date and the handler should be rebuilt.
+
+        Returns:
+            bool: True if the file's mtime or size differs from what this
+            handler last saw.
+        """
+        return _file_sig(self.ics_path) != self._file_sig
+
+    def _check_uid_index(self):
+        """
+        Asserts that every UID in the .ics file is in `existing_uids`.
+
+        Debug-only (NOTIFLOW_DEBUG): this parses and walks the whole file.
+        """
+        with open(self.ics_path, "rb") as f:
+            calendar = icalendar.Calendar.from_ical(f.read())
+        on_disk = {
+            _uid_key(str(component["UID"]))
+            for component in calendar.walk()
+            if "UID" in component
+        }
+        missing = on_disk - self.existing_uids
+        assert not missing, f"{len(missing)} UIDs in {self.ics_path} are not indexed"
+
+    def _ensure_loaded(self):
+        """
+        Parses the calendar file if it is not already loaded.
+
+        Falls back to a new, empty calendar if the file cannot be parsed. The
+        UID index then keeps only the components still waiting to be saved, as
+        nothing else from the file will be in the calendar that gets written.
+        """
+        if self.calendar is not None:
+            return
+        try:
+            with open(self.ics_path, "rb") as f:
+                self.calendar = icalendar.Calendar.from_ical(f.read())
+        except Exception as e:
+            log.warning("Error reading file, creating new: %s", e)
+            self.existing_uids = _collect_uids(b"".join(self._new_components))
             self._create_new_calendar()
 
     def _create_new_calendar(self):
@@ -93,23 +413,43 @@ class ICalHandler:
             str: A unique, sanitized string ID for the event.
         """
         raw_uid = f"{course}-{event_type}-{date_str}-{start_str}@notiflow.local"
-        return raw_uid.replace(" ", "_").replace("/", "")
+        return raw_uid.translate(_UID_TRANSLATE)
 
-    def create_event_object(self, event_json):
+    def _event_uid(self, event_json):
         """
-        Converts a JSON dictionary into an icalendar.Event object.
+        Checks that event JSON has its required fields and returns its UID.
 
-        Handles standard event fields as well as complex recurrence rules (RRULE)
-        and exception dates (EXDATE).
+        Args:
+            event_json (dict): See `create_event_object`.
+
+        Returns:
+            str: The event's UID.
+            None: If the input data is incomplete.
+        """
+        course = event_json.get("course")
+        date_str = event_json.get("date")
+        start_str = event_json.get("begin_date_time")
+        end_str = event_json.get("end_date_time")
+
+        if not all([course, date_str, start_str, end_str]):
+            log.debug("Skipping incomplete event data: %s", event_json)
+            return None
+
+        return self._generate_uid(
+            course, event_json.get("event_type"), date_str, start_str
+        )
+
+    def _event_fields(self, event_json, uid):
+        """
+        Resolves the values both event emitters need from complete event JSON.
 
         Args:
-            event_json (dict): A dictionary containing event details. Expected keys include:
-                - course, event_type, date, begin_date_time, end_date_time
-                - Optional recurrence keys: frequency, interval, by_day, exception_dates, until
+            event_json (dict): See `create_event_object`; must pass `_event_uid`.
+            uid (str): The event's UID.
 
         Returns:
-            icalendar.Event: The constructed event object.
-            None: If the input data is incomplete or the event is a duplicate.
+            tuple: (course, event_type, dt_start, dt_end, uid, location, rrule, exdates)
+                where rrule is a dict of RRULE parts or None.
         """
         course = event_json.get("course")
         event_type = event_json.get("event_type")
@@ -124,18 +464,79 @@ class ICalHandler:
         exception_dates = event_json.get("exception_dates")
         until = event_json.get("until", "")
 
-        if not all([course, date_str, start_str, end_str]):
-            print(f"Skipping incomplete event data: {event_json}")
-            return None
-
         dt_start = self.dateTimeParse(date_str, start_str)
         dt_end = self.dateTimeParse(date_str, end_str)
 
-        uid = self._generate_uid(course, event_type, date_str, start_str)
+        rrule = None
+        if frequency:
+            rrule = {'FREQ': frequency}
+            dt_until = self.dateTimeParse(until) if until else None
+            if dt_until:
+                rrule['UNTIL'] = dt_until
+            
+            if interval:
+                try:
+                    rrule['INTERVAL'] = int(interval)
+                except ValueError:
+                    pass
 
-        if uid in self.existing_uids:
-            print(f"Event already exists: {uid}")
+            if by_day:
+                rrule['BYDAY'] = by_day
+
+        exdates = []
+        for ex_date_str in exception_dates or ():
+            ex_dt = self.dateTimeParse(ex_date_str, start_str)
+            if ex_dt:
+                exdates.append(ex_dt)
+
+        return course, event_type, dt_start, dt_end, uid, location_str, rrule, exdates
+
+    def _prepare_event(self, event_json):
+        """
+        Validates and resolves a single event, recording its UID in `existing_uids`.
+
+        Args:
+            event_json (dict): See `create_event_object`.
+
+        Returns:
+            tuple: See `_event_fields`.
+            None: If the input data is incomplete or the event is a duplicate.
+        """
+        uid = self._event_uid(event_json)
+        if uid is None:
+            return None
+
+        key = _uid_key(uid)
+        if key in self.existing_uids:
+            log.debug("Event already exists: %s", uid)
+            return None
+
+        self.existing_uids.add(key)
+        return self._event_fields(event_json, uid)
+
+    def create_event_object(self, event_json, dtstamp=None):
+        """
+        Converts a JSON dictionary into an icalendar.Event object.
+
+        Handles standard event fields as well as complex recurrence rules (RRULE)
+        and exception dates (EXDATE). `process_json` writes events through the
+        faster `_format_vevent`; this is kept for callers that need an Event.
+
+        Args:
+            event_json (dict): A dictionary containing event details. Expected keys include:
+                - course, event_type, date, begin_date_time, end_date_time
+                - Optional recurrence keys: frequency, interval, by_day, exception_dates, until
+            dtstamp (datetime, optional): UTC creation stamp; defaults to now.
+                Batch callers compute it once and pass it in.
+
+        Returns:
+            icalendar.Event: The constructed event object.
+            None: If the input data is incomplete or the event is a duplicate.
+        """
+        fields = self._prepare_event(event_json)
+        if fields is None:
             return None
+        course, event_type, dt_start, dt_end, uid, location_str, rrule, exdates = fields
 
         event = icalendar.Event()
 
@@ -147,34 +548,15 @@ class ICalHandler:
         event.add('summary', summary_text)
         event.add('dtstart', dt_start)
         event.add('dtend', dt_end)
-        event.add('dtstamp', datetime.now(pytz.utc))
+        event.add('dtstamp', dtstamp or datetime.now(_UTC))
         event.add('uid', uid)
         event.add('description', f"Entry for {course} {event_type}")
 
-        if frequency:
-            dt_until = self.dateTimeParse(until)
-            rrule = {'FREQ': frequency}
-            rrule['UNTIL'] = dt_until
-            
-            if interval:
-                try:
-                    rrule['INTERVAL'] = int(interval)
-                except ValueError:
-                    pass
-
-            if by_day:
-                rrule['BYDAY'] = by_day
-                
+        if rrule:
             event.add('rrule', rrule)
 
-        if exception_dates:
-            for ex_date_str in exception_dates:
-                ex_dt = self.dateTimeParse(ex_date_str, start_str)
-                
-                # if ex_dt:
-                event.add('exdate', ex_dt)
-
-        self.existing_uids.add(uid)
+        for ex_dt in exdates:
+            event.add('exdate', ex_dt)
 
         return event
 
@@ -182,25 +564,205 @@ class ICalHandler:
         """
         Processes a list of event data, creating and adding events to the calendar.
 
+        UIDs for the whole batch are resolved and deduplicated (against the
+        calendar and within the batch) before any dates are parsed, then the
+        remaining events are serialized in one pass. Recurring events are
+        expanded into one VEVENT per occurrence (see `_expand_rrule`).
+
         Args:
             data (list[dict]): A list of dictionaries representing events.
         """
-        count = 0
+        pending = {}
         for item in data:
-            event = self.create_event_object(item)
-            # if event
-            self.calendar.add_component(event)
-            count += 1
-        # DEBUG
-        print(f"Processed {count} new events.")
+            uid = self._event_uid(item)
+            if uid is None:
+                continue
+            # a recurring event is stored as its occurrences, so the first one
+            # stands in for the series when checking against the file; older
+            # calendars hold the whole series under its plain UID with an RRULE
+            key = _uid_key(_occurrence_uid(uid, 0) if item.get("frequency") else uid)
+            if (
+                key in self.existing_uids
+                or key in pending
+                or _uid_key(uid) in self.existing_uids
+            ):
+                log.debug("Event already exists: %s", uid)
+                continue
+            pending[key] = (item, uid)
+
+        dtstamp = datetime.now(_UTC)
+        for key, (item, uid) in pending.items():
+            chunks = self._serialize_event(self._event_fields(item, uid), dtstamp)
+            if not chunks:
+                # nothing was written, so a later post of the series may retry
+                log.debug("Event has no occurrences: %s", uid)
+                continue
+            self.existing_uids.add(key)
+            self._new_components.extend(chunks)
+        log.debug("Processed %d new events.", len(pending))
+
+    def _serialize_event(self, fields, dtstamp=None):
+        """
+        Serializes an event from `_event_fields` as VEVENT blocks.
+
+        A recurring event becomes one VEVENT per occurrence, each with the
+        series UID suffixed by its index; the occurrence UIDs are recorded
+        in `existing_uids`.
+
+        Returns:
+            list[bytes]: The serialized VEVENTs.
+        """
+        course, event_type, dt_start, dt_end, uid, location, rrule, exdates = fields
+        if not rrule:
+            return [_format_fields(fields, dtstamp)]
+
+        chunks = []
+        occurrences = self._expand_rrule(dt_start, dt_end, rrule, exdates)
+        for index, (start, end) in enumerate(occurrences):
+            occurrence_uid = _occurrence_uid(uid, index)
+            self.existing_uids.add(_uid_key(occurrence_uid))
+            chunks.append(
+                _format_vevent(
+                    course, event_type, start, end, occurrence_uid, location,
+                    dtstamp=dtstamp,
+                )
+            )
+        return chunks
+
+    def _expand_rrule(self, dt_start, dt_end, rrule, exdates):
+        """
+        Lists the occurrences of a recurring event.
+
+        The series runs to its UNTIL, or to the end of term when it has none;
+        if the term has already ended it runs for `_DEFAULT_SPAN` instead. As
+        in RFC 5545, the first occurrence is always `dt_start` unless excluded.
+        Recurrence is evaluated on local wall-clock time, so a weekly class
+        keeps its time across DST changes.
+
+        Args:
+            dt_start (datetime): Local start of the first occurrence.
+            dt_end (datetime): Local end of the first occurrence.
+            rrule (dict): RRULE parts as built by `_event_fields`.
+            exdates (Iterable[datetime]): Local start times to skip.
+
+        Returns:
+            list[tuple[datetime, datetime]]: (start, end) of each occurrence.
+        """
+        start = dt_start.replace(tzinfo=None)
+        duration = dt_end - dt_start
+        until = rrule.get("UNTIL")
+        if until is None:
+            until = self.dateTimeParse(self.term_end_date)
+        until = until.replace(tzinfo=None)
+        if until < start and "UNTIL" not in rrule:
+            until = start + _DEFAULT_SPAN
+
+        rule = rrulestr(_format_rrule(dict(rrule, UNTIL=until)), dtstart=start)
+        starts = list(rule)
+        if not starts or starts[0] != start:
+            starts.insert(0, start)  # dtstart need not match BYDAY
+        skipped = {ex.replace(tzinfo=None) for ex in exdates}
+        return [
+            (
+                occurrence.replace(tzinfo=self.tz),
+                (occurrence + duration).replace(tzinfo=self.tz),
+            )
+            for occurrence in starts
+            if occurrence not in skipped
+        ]
 
     def save_calendar(self):
         """
-        Serializes and writes the current calendar object to the .ics file.
+        Writes the components added since the last save to the .ics file.
+
+        An existing file is updated in place: new components overwrite its
+        closing END:VCALENDAR, which is then re-appended, so existing events are
+        never re-serialized. A calendar held in memory (a new file, or one that
+        could not be read) is written out in full instead.
+        """
+        new_components = b"".join(self._new_components)
+        if self.calendar is None:
+            if not new_components:
+                return
+            if not self._append_components(new_components):
+                self._ensure_loaded()
+
+        if self.calendar is not None:
+            self._write_calendar(new_components)
+            # the file now holds everything, so later saves can append to it
+            self.calendar = None
+        self._new_components.clear()
+        self._file_sig = _file_sig(self.ics_path)
+
+        if _DEBUG_CHECK:
+            self._check_uid_index()
+        log.debug("Calendar saved successfully to %s", self.ics_path)
+
+    def _append_components(self, new_components):
+        """
+        Inserts serialized components before the file's closing END:VCALENDAR.
+
+        A file whose trailer is missing (e.g. cut short by an earlier failed
+        write) gets the components and a new trailer appended, so a non-empty
+        file is never handed back to be rewritten from scratch.
+
+        Args:
+            new_components (bytes): The components to add.
+
+        Returns:
+            bool: False if the file is missing or empty.
+
+        Raises:
+            OSError: If writing fails once the file has been opened; the file is
+                cut back to its previous events and its trailer restored.
+        """
+        try:
+            fd = os.open(self.ics_path, os.O_RDWR | os.O_APPEND)
+        except OSError:
+            return False
+        try:
+            size = os.fstat(fd).st_size
+            if size == 0:
+                return False
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                end = mm.rfind(b"END:VCALENDAR")
+                if end == -1:
+                    end = size
+                    if not mm[size - 1:].endswith(b"\n"):
+                        new_components = b"\r\n" + new_components
+            # cut the trailer off, then a single appending write puts the new
+            # components and a fresh trailer at the end
+            os.ftruncate(fd, end)
+            try:
+                chunk = memoryview(new_components + _TRAILER)
+                while chunk:
+                    chunk = chunk[os.write(fd, chunk):]
+            except BaseException:
+                self._restore_trailer(fd, end)
+                raise
+        finally:
+            os.close(fd)
+        return True
+
+    def _restore_trailer(self, fd, end):
+        """
+        Cuts a partly appended file back to `end` and re-adds END:VCALENDAR.
+        """
+        try:
+            os.ftruncate(fd, end)
+            os.write(fd, _TRAILER)
+        except OSError as e:
+            log.warning("Could not restore %s after a failed save: %s", self.ics_path, e)
+
+    def _write_calendar(self, new_components):
+        """
+        Writes the in-memory calendar plus `new_components` over the file.
+
+        The calendar is streamed out one component at a time (see `_write_ical`)
+        rather than serialized to a single bytes object first.
         """
         with open(self.ics_path, "wb") as f:
-            f.write(self.calendar.to_ical())
-            print(f"Calendar saved successfully to {self.ics_path}")
+            _write_ical(self.calendar, f, new_components)
 
     def dateTimeParse(self, date_str, time_str="12:00:00"):
         """
@@ -214,24 +776,19 @@ class ICalHandler:
             datetime: A timezone-aware datetime object (America/Vancouver).
             None: If parsing fails.
         """
-        format_date = "%Y/%m/%d"
-        format_time_full = "%H:%M:%S"
-        format_time_short = "%H:%M"
-
+        # fixed formats, so split on the separators instead of using strptime
         try:
-            date_object = datetime.strptime(date_str, format_date).date()
+            year, month, day = map(int, date_str.split("/"))
 
-            try:
-                time_object = datetime.strptime(time_str, format_time_full).time()
-            except ValueError:
-                time_object = datetime.strptime(time_str, format_time_short).time()
+            time_parts = time_str.split(":")
+            if len(time_parts) == 2:
+                time_parts.append("0")
+            hour, minute, second = map(int, time_parts)
 
-            dt_naive = datetime.combine(date_object, time_object)
-            dt_aware = dt_naive.replace(tzinfo=self.tz)
-            return dt_aware
+            return datetime(year, month, day, hour, minute, second, tzinfo=self.tz)
 
         except ValueError as e:
-            print(f"Error parsing date/time ({date_str} {time_str}): {e}")
+            log.warning("Error parsing date/time (%s %s): %s", date_str, time_str, e)
             return None
 
     def _parse_canvas_iso(self, iso_str: str):
@@ -247,7 +804,7 @@ class ICalHandler:
         """
         if not iso_str:
             return None
-        dt_utc = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+        dt_utc = datetime.fromisoformat(iso_str)  # reads a trailing "Z" natively
 
         # if dt_utc.tzinfo is None:
         #     dt_utc = dt_utc.replace(tzinfo=timezone.utc)
@@ -269,9 +826,16 @@ class ICalHandler:
             str: A unique identifier string.
         """
         raw_uid = f"{course}-ASSIGNMENT-{assignment_name}-{iso_start}@notiflow.local"
-        return raw_uid.replace(" ", "_").replace("/", "")
-
-    def create_task_object(self, course: str, assignment_name: str, iso_start: str):
+        return raw_uid.translate(_UID_TRANSLATE)
+
+    def create_task_object(
+        self,
+        course: str,
+        assignment_name: str,
+        iso_start: str,
+        dt_start=None,
+        dtstamp=None,
+    ):
         """
         Creates an iCalendar VTODO (Task) for a specific assignment.
 
@@ -279,36 +843,43 @@ class ICalHandler:
             course (str): The course identifier.
             assignment_name (str): The assignment title.
             iso_start (str): The due date/start date in ISO format.
+            dt_start (datetime, optional): `iso_start` already parsed with
+                `_parse_canvas_iso`; parsed here if omitted.
+            dtstamp (datetime, optional): UTC creation stamp; defaults to now.
 
         Returns:
             icalendar.Todo: The constructed task object.
             None: If data is incomplete or parsing fails.
         """
         if not all([course, assignment_name, iso_start]):
-            print(
-                f"Skipping incomplete assignment task: {course}, {assignment_name}, {iso_start}"
+            log.debug(
+                "Skipping incomplete assignment task: %s, %s, %s",
+                course,
+                assignment_name,
+                iso_start,
             )
             return None
 
-        dt_start = self._parse_canvas_iso(iso_start)
+        if dt_start is None:
+            dt_start = self._parse_canvas_iso(iso_start)
         # if not dt_start:
         #     print(f"Could not parse start time for assignment: {assignment_name}")
         #     return None
 
         uid = self._generate_task_uid(course, assignment_name, iso_start)
-        if uid in self.existing_uids:
-            print(f"Task already exists: {uid}")
+        if _uid_key(uid) in self.existing_uids:
+            log.debug("Task already exists: %s", uid)
             return None
 
         todo = icalendar.Todo()
         summary_text = f"{course} - {assignment_name}"
         todo.add("summary", summary_text)
         todo.add("dtstart", dt_start)
-        todo.add("dtstamp", datetime.now(pytz.utc))
+        todo.add("dtstamp", dtstamp or datetime.now(_UTC))
         todo.add("uid", uid)
         todo.add("description", f"Assignment task for {course}: {assignment_name}")
 
-        self.existing_uids.add(uid)
+        self.existing_uids.add(_uid_key(uid))
         return todo
 
     def process_assignments(self, assignments_data):
@@ -316,23 +887,34 @@ class ICalHandler:
         Parses Canvas assignment JSON data and adds them as tasks to the calendar.
 
         Args:
-            assignments_data (str): A JSON string containing assignment data grouped by course.
+            assignments_data (str | bytes): JSON containing assignment data grouped by course.
         """
-        data = json.loads(assignments_data)
+        data = orjson.loads(assignments_data)
         count = 0
+        # assignments often share a due time, so parse each distinct one once
+        parsed_starts = {}
+        dtstamp = datetime.now(_UTC)
 
         for course, course_data in data.items():
             for assignment_group in course_data.get("assignments", []):
                 for assignment in assignment_group:
                     name = assignment[0]
                     iso_start = assignment[3]
-
-                    todo = self.create_task_object(course, name, iso_start)
-                    # if todo:
-                    self.calendar.add_component(todo)
-                    count += 1
-
-        print(f"Processed {count} assignment tasks.")
+                    if iso_start not in parsed_starts:
+                        parsed_starts[iso_start] = self._parse_canvas_iso(iso_start)
+
+                    todo = self.create_task_object(
+                        course,
+                        name,
+                        iso_start,
+                        dt_start=parsed_starts[iso_start],
+                        dtstamp=dtstamp,
+                    )
+                    if todo:
+                        self._new_components.append(todo.to_ical())
+                        count += 1
+
+        log.debug("Processed %d assignment tasks.", count)
 
     def _parse_course_meetings(self, course_meetings_json):
         """
@@ -361,31 +943,21 @@ class ICalHandler:
             parsed_event["begin_date_time"] = start_dt.strftime("%H:%M:%S")
             parsed_event["end_date_time"] = end_dt.strftime("%H:%M:%S")
         except ValueError as e:
-            print(f"Time parsing error: {e}")
+            log.warning("Time parsing error: %s", e)
             return None
 
         parsed_event["frequency"] = "WEEKLY"
         
-        day_map = {
-            "M": "MO", 
-            "Tu": "TU", 
-            "W": "WE", 
-            "Th": "TH", 
-            "F": "FR", 
-            "Sa": "SA", 
-            "Su": "SU"
-        }
-        
         raw_days = course_meetings_json.get("days", {})
-        selected_days = []
-
-        for day_key, is_selected in raw_days.items():
-            if is_selected and day_key in day_map:
-                selected_days.append(day_map[day_key])
+        selected_days = [by_day for key, by_day in _DAY_MAP if raw_days.get(key)]
 
         parsed_event["by_day"] = selected_days
         
-        parsed_event["until"] = self.term_end_date
+        # a term that has already ended would leave no meetings to add, so the
+        # series then falls back to `_expand_rrule`'s default span
+        term_end = self.dateTimeParse(self.term_end_date)
+        if term_end and term_end.date() >= current_date:
+            parsed_event["until"] = self.term_end_date
 
         return parsed_event
 
@@ -394,14 +966,14 @@ class ICalHandler:
         Processes course meeting data, handles JSON parsing, and triggers event creation.
 
         Args:
-            course_meetings_json (str | dict): The course meeting data as a JSON string
-                or dictionary.
+            course_meetings_json (str | bytes | dict): The course meeting data as
+                JSON text, a raw (undecoded) JSON body, or a dictionary.
         """
-        if isinstance(course_meetings_json, str):
+        if isinstance(course_meetings_json, (str, bytes)):
             try:
-                data_dict = json.loads(course_meetings_json)
-            except json.JSONDecodeError as e:
-                print(f"Invalid JSON provided: {e}")
+                data_dict = orjson.loads(course_meetings_json)
+            except orjson.JSONDecodeError as e:
+                log.warning("Invalid JSON provided: %s", e)
                 return
         else:
             data_dict = course_meetings_json
@@ -23,6 +23,10 @@ Routes:
   GET /api/announcements  → returns announcement data
   GET /api/assignments    → returns assignment grouping by course
 """
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 try: # relative import if run as module
     from announcement_feature.announcement_main import main as announcement_main
 except ModuleNotFoundError: # absolute import if run as script
@@ -45,9 +49,72 @@ try: # relative import if run as module
 except ModuleNotFoundError: # absolute import if run as script
     from Backend.iCalBackendNew import ICalHandler
 
+log = logging.getLogger(__name__)
+
 app = Flask(__name__)
 cors = CORS(app, origins="*")
 
+# one ICalHandler per calendar file, so the .ics file is read and parsed once
+# rather than on every request. Every token writes the same file, so handlers are
+# keyed by file (which also bounds the cache) and rebuilt when the file changed
+# behind their back; _LOCK also serializes calendar updates across threads
+_CALENDAR_FILE = "calendar.ics"
+_HANDLERS: dict[str, ICalHandler] = {}
+_LOCK = threading.Lock()
+
+# runs the Canvas fetch for a request while the request thread loads the calendar
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="canvas")
+
+
+def get_handler(token):
+    """
+    Returns the cached ICalHandler for the calendar file, creating it on first
+    use or again if the file was modified since the handler last saw it.
+
+    Args:
+        token (str | None): Canvas API token of the request.
+
+    Returns:
+        ICalHandler: The shared handler for the calendar file.
+    """
+    with _LOCK:
+        return _get_handler_locked(token)
+
+
+def _get_handler_locked(token):
+    """
+    Same as `get_handler`, for callers that already hold `_LOCK`.
+    """
+    handler = _HANDLERS.get(_CALENDAR_FILE)
+    if handler is None or handler.is_stale():
+        handler = _HANDLERS[_CALENDAR_FILE] = ICalHandler(
+            token, filename=_CALENDAR_FILE
+        )
+    return handler
+
+
+def _update_calendar(token, update):
+    """
+    Applies `update(handler)` to the calendar and saves it.
+
+    The handler is looked up (and rebuilt if stale), updated and saved under
+    one hold of `_LOCK`, so another request cannot drop or replace it midway.
+    If processing or saving fails the cached handler is dropped, so the next
+    request starts again from what is on disk.
+
+    Args:
+        token (str | None): Canvas API token.
+        update (Callable[[ICalHandler], None]): Adds events to the handler.
+    """
+    with _LOCK:
+        handler = _get_handler_locked(token)
+        try:
+            update(handler)
+            handler.save_calendar()
+        except Exception:
+            _HANDLERS.pop(_CALENDAR_FILE, None)
+            raise
+
 """
 GET /api/courses
 
@@ -81,7 +148,7 @@ Query Params:
 Process:
   1. Reads all course[] parameters into a list.
   2. Calls FinalExamFetcher.get_finals(courses) to fetch exam data.
-  3. Passes the exam data into ICalHandler to generate an .ics calendar file.
+  3. Passes the exam data into the cached ICalHandler to update the .ics file.
   4. Returns the exam data as JSON.
 
 Returns:
@@ -90,13 +157,13 @@ Returns:
 @app.route("/api/finalexam", methods=["GET"])
 def finalexam():
     courses = request.args.getlist("course[]")
-    token = request.args.getlist("token")
-    print(courses)
-    finals_response = fe.get_finals(courses)  # FIXME verify
-    print(finals_response)
-    handler = ICalHandler(token)
-    handler.process_json(finals_response)
-    handler.save_calendar()
+    token = request.args.get("token")
+    log.debug("Final exam request for %s", courses)
+    pending = _POOL.submit(fe.get_finals, courses)
+    get_handler(token)  # load the calendar while the exams are fetched
+    finals_response = pending.result()
+    log.debug("Final exams: %s", finals_response)
+    _update_calendar(token, lambda handler: handler.process_json(finals_response))
     return jsonify(finals_response)
     # courses = request.args.getlist("course[]")
     # finals = fe.get_finals(courses)
@@ -116,7 +183,7 @@ Query Params:
 Process:
   1. Reads token from query string.
   2. Uses announcement_main(token) to retrieve announcement data.
-  3. Sends the data through ICalHandler to create an .ics calendar file.
+  3. Sends the data through the cached ICalHandler to update the .ics file.
   4. Returns announcement JSON.
   5. On failure, returns an error object with status 500.
 
@@ -127,10 +194,10 @@ Returns:
 def announcements():
     try:
         token = request.args.get("token")
-        handler = ICalHandler(token)
-        ann = announcement_main(token)
-        handler.process_json(ann)
-        handler.save_calendar()
+        pending = _POOL.submit(announcement_main, token)
+        get_handler(token)  # load the calendar while Canvas is queried
+        ann = pending.result()
+        _update_calendar(token, lambda handler: handler.process_json(ann))
         return ann
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -156,11 +223,13 @@ Returns:
 def assignments():
     try:
         token = request.args.get("token")
-        print("Received token:", token)
-        handler = ICalHandler(token)
-        assignments = mapCourses(token)
-        handler.process_assignments(assignments)
-        handler.save_calendar()
+        log.debug("Assignments request received")
+        pending = _POOL.submit(mapCourses, token)
+        get_handler(token)  # load the calendar while Canvas is queried
+        assignments = pending.result()
+        _update_calendar(
+            token, lambda handler: handler.process_assignments(assignments)
+        )
         return assignments
     except Exception as e:
         return jsonify({"error": str(e)}), 500
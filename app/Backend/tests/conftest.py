@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent)  # .../app/Backend
+
+
+@pytest.fixture(scope="session")
+def server_mod():
+    """Backend.server, imported once per session on first use."""
+    # make Backend dir importable so server's own imports work no matter
+    # how uv/pytest runs
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import Backend.server as server
+
+    server.app.testing = True
+    return server
+
+
+@pytest.fixture(scope="session")
+def _todo_returner():
+    todo = Mock(spec_set=["to_ical"])
+    todo.to_ical.return_value = b"TODO"
+    return Mock(return_value=todo)
+
+
+@pytest.fixture
+def todo_returner(_todo_returner):
+    """Stand-in for create_task_object whose todo serializes to b"TODO"."""
+    _todo_returner.reset_mock()  # keeps the configured return values
+    return _todo_returner
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from datetime import datetime
 import json
 import sys
@@ -16,6 +16,8 @@ import os
 # sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from Backend.final_exam_feature.FinalExam import FinalExamFetcher
 
+PATCH_GET = "Backend.final_exam_feature.FinalExam._session.get"
+
 # try:
 #     from final_exam_feature.FinalExam import FinalExamFetcher
 # except ImportError:
@@ -89,11 +91,14 @@ def test_end_time_rollover():
     expected = "00:30:00" # Next day
     assert FinalExamFetcher._end_time(start_time) == expected
 
+def test_end_time_keeps_seconds():
+    assert FinalExamFetcher._end_time("23:45:30") == "02:15:30"
+
 # --- Main Logic Tests (get_final) ---
 
-@patch('requests.get')
-def test_get_final_success(mock_get, mock_api_response_success):
+def test_get_final_success(mocker, mock_api_response_success):
     """Test happy path: valid course, valid HTML, successful parsing."""
+    mock_get = mocker.patch(PATCH_GET)
     
     # Configure the mock
     mock_response = MagicMock()
@@ -116,9 +121,9 @@ def test_get_final_success(mock_get, mock_api_response_success):
     assert "L-Z: SRC B" in result['location']
     assert ", " in result['location']
 
-@patch('requests.get')
-def test_get_final_404_error(mock_get):
+def test_get_final_404_error(mocker):
     """Test API returning a non-200 status code."""
+    mock_get = mocker.patch(PATCH_GET)
     mock_response = MagicMock()
     mock_response.status_code = 404
     mock_get.return_value = mock_response
@@ -126,9 +131,9 @@ def test_get_final_404_error(mock_get):
     result = FinalExamFetcher.get_final("CPEN 221")
     assert result is None
 
-@patch('requests.get')
-def test_get_final_no_exam_data(mock_get, mock_html_no_exam):
+def test_get_final_no_exam_data(mocker, mock_html_no_exam):
     """Test valid API response but HTML contains no exam info."""
+    mock_get = mocker.patch(PATCH_GET)
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.return_value = [
@@ -142,9 +147,9 @@ def test_get_final_no_exam_data(mock_get, mock_html_no_exam):
     result = FinalExamFetcher.get_final("CPEN 221")
     assert result is None
 
-@patch('requests.get')
-def test_get_final_malformed_json(mock_get):
+def test_get_final_malformed_json(mocker):
     """Test valid API response but JSON doesn't contain 'insert' command."""
+    mock_get = mocker.patch(PATCH_GET)
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.json.return_value = [{"command": "alert", "data": "Something else"}]
@@ -155,14 +160,14 @@ def test_get_final_malformed_json(mock_get):
 
 # --- Batch Logic Tests (get_finals) ---
 
-@patch('requests.get')
-def test_get_finals_batch(mock_get, mock_api_response_success):
+def test_get_finals_batch(mocker, mock_api_response_success):
     """
     Test processing a list of courses.
     Scenario: 
     - Course 1 returns valid data.
     - Course 2 returns None (e.g., 404).
     """
+    mock_get = mocker.patch(PATCH_GET)
     
     # Mock for Success
     response_success = MagicMock()
@@ -173,17 +178,26 @@ def test_get_finals_batch(mock_get, mock_api_response_success):
     response_fail = MagicMock()
     response_fail.status_code = 404
 
-    # side_effect allows us to define different return values for sequential calls
-    # Sequence based on get_finals implementation (naive vs optimized):
-    # Optimized: 1 call for CPEN 221 (Success), 1 call for INVALID 101 (Fail)
-    # Naive (current): 2 calls for CPEN 221 (Check+Append), 1 call for INVALID 101
-    
-    # Assuming the code is currently Naive (calling get_final twice):
-    mock_get.side_effect = [response_success, response_success, response_fail]
+    # get_finals fetches courses concurrently, so route by course rather than
+    # relying on call order
+    responses = {"CPEN 221": response_success, "INVALID 101": response_fail}
+    mock_get.side_effect = lambda url, params, **kwargs: responses[params["course"]]
 
     courses = ["CPEN 221", "INVALID 101"]
     
     results = FinalExamFetcher.get_finals(courses)
 
     assert len(results) == 1
-    assert results[0]['course'] == "CPEN 221"
\ No newline at end of file
+    assert results[0]['course'] == "CPEN 221"
+    # exactly one request per course, no re-fetch for the append
+    assert mock_get.call_count == 2
+
+def test_get_finals_repeated_course_fetched_once(mocker, mock_api_response_success):
+    mock_get = mocker.patch(PATCH_GET)
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = mock_api_response_success
+
+    results = FinalExamFetcher.get_finals(["CPEN 221", "CPEN 221"])
+
+    assert [r["course"] for r in results] == ["CPEN 221"]
+    mock_get.assert_called_once()
@@ -1,20 +1,46 @@
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, Mock
 
+import orjson
 import pytest
 
+from Backend.announcement_feature import announcement_fetcher
 from Backend.announcement_feature.announcement_fetcher import AnnouncementFetcher
 
-PATCH_GET = "Backend.announcement_feature.announcement_fetcher.requests.get"
+# Canvas filters by date server-side, so any fixed timestamp will do
+NOW_ISO = "2025-11-27T00:00:00Z"
+# fixed clock for is_current_term, passed through its `now` argument
+NOW = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+
 # ---- Fixtures ----
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(announcement_fetcher.canvas_cache, "CACHE_DIR", tmp_path)
+    return tmp_path
+
+
 @pytest.fixture
+def fake_get(monkeypatch):
+    # plain attribute swap on the shared session, no patch() machinery
+    get = Mock()
+    monkeypatch.setattr(announcement_fetcher._session, "get", get)
+    return get
+
+
+@pytest.fixture(scope="session")
 def mock_fetcher():
-    f = AnnouncementFetcher.__new__(AnnouncementFetcher)
-    f.course_names = {}
-    f.course_ids = []
-    return f  # bypass __init__ for isolated tests
+    return AnnouncementFetcher.__new__(AnnouncementFetcher)  # bypass __init__
+
+
+@pytest.fixture(autouse=True)
+def _reset_mock_fetcher(mock_fetcher):
+    # drop whatever the previous test set, including method overrides
+    vars(mock_fetcher).clear()
+    mock_fetcher.course_names = {}
+    mock_fetcher.course_ids = []
+    mock_fetcher.token = None
 
 
 # ---- Tests ----
@@ -25,26 +51,24 @@ def test_init_raises_on_none_token():
         AnnouncementFetcher(None)
 
 
-@patch.object(AnnouncementFetcher, "get_course_ids", return_value=[101])
-def test_init_stores_token_and_courses(mock_get_ids):
+def test_init_stores_token_and_courses(mocker):
+    mocker.patch.object(AnnouncementFetcher, "get_course_ids", return_value=[101])
     f = AnnouncementFetcher("abc123")
     assert f.token == "abc123"
     assert f.course_ids == [101]
 
 
 def test_is_current_term_true(mock_fetcher):
-    now = datetime.now(timezone.utc)
     term = {
-        "start_at": (now.replace(hour=0).isoformat()),
-        "end_at": (now.replace(hour=23).isoformat()),
+        "start_at": NOW.replace(hour=0).isoformat(),
+        "end_at": NOW.replace(hour=23).isoformat(),
     }
-    assert mock_fetcher.is_current_term(term) is True
+    assert mock_fetcher.is_current_term(term, NOW) is True
 
 
 def test_is_current_term_none(mock_fetcher):
-    now = datetime.now(timezone.utc)
-    term = {"start_at": None, "end_at": (now.replace(hour=23).isoformat())}
-    assert mock_fetcher.is_current_term(term) is False
+    term = {"start_at": None, "end_at": NOW.replace(hour=23).isoformat()}
+    assert mock_fetcher.is_current_term(term, NOW) is False
 
 
 def test_is_current_term_false(mock_fetcher):
@@ -53,23 +77,35 @@ def test_is_current_term_false(mock_fetcher):
     assert mock_fetcher.is_current_term({"start_at": past, "end_at": future}) is False
 
 
+def test_is_current_term_explicit_now(mock_fetcher):
+    term = {"start_at": "2020-01-01T00:00:00Z", "end_at": "2021-01-01T00:00:00Z"}
+    inside = datetime(2020, 6, 1, tzinfo=timezone.utc)
+    assert mock_fetcher.is_current_term(term, inside) is True
+    assert announcement_fetcher.canvas_cache.parse_bounds.cache_info().currsize >= 1
+
+
 def test_html_to_string_removes_tags(mock_fetcher):
     html = "<p>plzScale <b>this course</b>!This is a Test</p>"
     out = mock_fetcher.html_to_string(html)
     assert out == "plzScale this course!This is a Test"
 
 
+def test_html_to_string_plain_text(mock_fetcher):
+    out = mock_fetcher.html_to_string("  Midterm moved to Friday .\xa0")
+    assert out == "Midterm moved to Friday."
+
+
 def test_html_to_string_with_none(mock_fetcher):
     html = None
     out = mock_fetcher.html_to_string(html)
     assert out == ""
 
 
-@patch("requests.get")
-def test_get_course_ids_filters_current_term(mock_get, mock_fetcher):
-    # Mock API returning two courses, only one active
+def test_get_course_ids_filters_current_term(fake_get, mock_fetcher):
+    # Mock API returning two pages of courses, only one active
     mock_fetcher.is_current_term = MagicMock(side_effect=[True, False])
-    mock_get.return_value.json.side_effect = [
+    first, second = MagicMock(), MagicMock()
+    first.content = orjson.dumps(
         [
             {
                 "id": 101,
@@ -77,35 +113,100 @@ def test_get_course_ids_filters_current_term(mock_get, mock_fetcher):
                 "term": {},
                 "access_restricted_by_date": None,
             },
+        ]
+    )
+    first.headers = {
+        "Link": '<https://canvas.ubc.ca/api/v1/courses?page=2>; rel="next"'
+    }
+    second.content = orjson.dumps(
+        [
             {
                 "id": 202,
                 "name": "CPEN 391",
                 "term": {},
                 "access_restricted_by_date": None,
             },
-        ],
-        [],  # stop pagination
-    ]
+        ]
+    )
+    second.headers = {}  # last page
+    fake_get.side_effect = [first, second]
     mock_fetcher.token = "token"
     result = mock_fetcher.get_course_ids()
     assert result == [101]
+    assert fake_get.call_count == 2
+    assert fake_get.call_args_list[0].kwargs["params"]["per_page"] == 100
+    assert fake_get.call_args_list[1].args[0].endswith("page=2")
+
+
+def test_get_course_ids_uses_cache(fake_get, mock_fetcher):
+    mock_fetcher.token = "token"
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps(
+        [
+            {
+                "id": 101,
+                "name": "CPEN 311",
+                "term": {
+                    "start_at": "2000-01-01T00:00:00Z",
+                    "end_at": "2099-01-01T00:00:00Z",
+                },
+                "access_restricted_by_date": None,
+            },
+        ]
+    )
+    assert mock_fetcher.get_course_ids() == [101]
+
+    # second fetcher for the same token is served from disk
+    other = AnnouncementFetcher.__new__(AnnouncementFetcher)
+    other.token = "token"
+    other.course_names = {}
+    assert other.get_course_ids() == [101]
+    assert other.course_names == {101: "CPEN 311"}
+    assert fake_get.call_count == 1
+
+    other.get_course_ids(force_refresh=True)
+    assert fake_get.call_count == 2
+
+
+def test_get_course_ids_cache_expires_with_term(fake_get, mock_fetcher):
+    mock_fetcher.token = "token"
+    announcement_fetcher.canvas_cache.store_cache(
+        "token", "courses", [[101, "CPEN 311"]], 0.0
+    )
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps([])
 
+    assert mock_fetcher.get_course_ids() == []
+    fake_get.assert_called_once()
 
-@patch("requests.get")
-def test_get_announcements_groups_by_course(mock_get, mock_fetcher):
+
+def test_get_course_ids_skips_cache_on_error_page(fake_get, mock_fetcher):
+    mock_fetcher.token = "token"
+    mock_fetcher.course_names = {}
+    error = MagicMock(headers={}, content=orjson.dumps({"errors": [{"message": "x"}]}))
+    fake_get.return_value = error
+
+    assert mock_fetcher.get_course_ids() == []
+    assert announcement_fetcher.canvas_cache.load_cache("token", "courses") is None
+
+
+def test_get_announcements_groups_by_course(fake_get, mock_fetcher):
     mock_fetcher.token = "token"
     mock_fetcher.course_ids = [123]
     mock_fetcher.course_names = {123: "CPEN 311"}
     mock_fetcher.html_to_string = lambda x: "Parsed message"
 
-    mock_get.return_value.json.return_value = [
-        {
-            "id": 1,
-            "context_code": "course_123",
-            "message": "<p>Hello</p>",
-            "posted_at": "2025-11-27T00:00:00Z",
-        }
-    ]
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps(
+        [
+            {
+                "id": 1,
+                "context_code": "course_123",
+                "message": "<p>Hello</p>",
+                "posted_at": "2025-11-27T00:00:00Z",
+            }
+        ]
+    )
 
     result = mock_fetcher.get_announcements()
     assert "CPEN 311" in result
@@ -113,66 +214,83 @@ def test_get_announcements_groups_by_course(mock_get, mock_fetcher):
     assert result["CPEN 311"][0]["message"] == "Parsed message"
 
 
-@patch(PATCH_GET)
-def test_duplicate_id_skipped(mock_get, mock_fetcher):
+def test_single_request_for_all_courses(fake_get, mock_fetcher):
     mock_fetcher.token = "token"
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-    mock_fetcher.course_ids = [123]
-    mock_fetcher.course_names = {123: "CPEN 311"}
+    mock_fetcher.course_ids = [123, 456]
+    mock_fetcher.course_names = {123: "CPEN 311", 456: "CPEN 391"}
 
-    mock_get.return_value.json.return_value = [
-        {
-            "id": 1,
-            "context_code": "course_123",
-            "message": "<p>First</p>",
-            "posted_at": now,
-        },
-        {
-            "id": 1,
-            "context_code": "course_123",
-            "message": "<p>Dup</p>",
-            "posted_at": now,
-        },
-    ]
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps(
+        [
+            {
+                "id": 1,
+                "context_code": "course_123",
+                "message": "<p>First</p>",
+                "posted_at": NOW_ISO,
+            },
+            {
+                "id": 2,
+                "context_code": "course_456",
+                "message": "<p>Second</p>",
+                "posted_at": NOW_ISO,
+            },
+        ]
+    )
 
     result = mock_fetcher.get_announcements()
-    assert list(result.keys()) == ["CPEN 311"]
-    assert len(result["CPEN 311"]) == 1
+    fake_get.assert_called_once()
+    params = fake_get.call_args.kwargs["params"]
+    assert ("context_codes[]", "course_123") in params
+    assert ("context_codes[]", "course_456") in params
     assert result["CPEN 311"][0]["message"] == "First"
+    assert result["CPEN 391"][0]["message"] == "Second"
+
+
+def test_no_courses_skips_request(fake_get, mock_fetcher):
+    mock_fetcher.token = "token"
+    assert mock_fetcher.get_announcements() == {}
+    fake_get.assert_not_called()
 
 
 # --- Missing context_code (covers: if context is not None False branch) ---
-@patch(PATCH_GET)
-def test_missing_context_skipped(mock_get, mock_fetcher):
+def test_missing_context_skipped(fake_get, mock_fetcher):
     mock_fetcher.token = "token"
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     mock_fetcher.course_ids = [123]
     mock_fetcher.course_names = {123: "CPEN 311"}
 
-    mock_get.return_value.json.return_value = [
-        {"id": 10, "context_code": None, "message": "<p>Ignored</p>", "posted_at": now}
-    ]
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps(
+        [
+            {
+                "id": 10,
+                "context_code": None,
+                "message": "<p>Ignored</p>",
+                "posted_at": NOW_ISO,
+            }
+        ]
+    )
 
     result = mock_fetcher.get_announcements()
     assert result == {}
 
 
 # --- Course name not yet in announcementsByCourse (True branch) ---
-@patch(PATCH_GET)
-def test_new_course_entry_created(mock_get, mock_fetcher):
+def test_new_course_entry_created(fake_get, mock_fetcher):
     mock_fetcher.token = "token"
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     mock_fetcher.course_ids = [123]
     mock_fetcher.course_names = {123: "CPEN 311"}
 
-    mock_get.return_value.json.return_value = [
-        {
-            "id": 20,
-            "context_code": "course_123",
-            "message": "<p>Hello</p>",
-            "posted_at": now,
-        }
-    ]
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps(
+        [
+            {
+                "id": 20,
+                "context_code": "course_123",
+                "message": "<p>Hello</p>",
+                "posted_at": NOW_ISO,
+            }
+        ]
+    )
 
     result = mock_fetcher.get_announcements()
     assert "CPEN 311" in result
@@ -180,39 +298,41 @@ def test_new_course_entry_created(mock_get, mock_fetcher):
 
 
 # --- Missing msg or posted_at (covers: if msg and posted_at False) ---
-@patch(PATCH_GET)
-def test_missing_message_or_posted_at_skipped(mock_get, mock_fetcher):
+def test_missing_message_or_posted_at_skipped(fake_get, mock_fetcher):
     mock_fetcher.token = "token"
     mock_fetcher.course_ids = [123]
     mock_fetcher.course_names = {123: "CPEN 311"}
 
-    mock_get.return_value.json.return_value = [
-        {
-            "id": 30,
-            "context_code": "course_123",
-            "message": None,
-            "posted_at": "2025-01-01T00:00:00Z",
-        },
-        {
-            "id": 31,
-            "context_code": "course_123",
-            "message": "<p>Hi</p>",
-            "posted_at": None,
-        },
-    ]
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps(
+        [
+            {
+                "id": 30,
+                "context_code": "course_123",
+                "message": None,
+                "posted_at": "2025-01-01T00:00:00Z",
+            },
+            {
+                "id": 31,
+                "context_code": "course_123",
+                "message": "<p>Hi</p>",
+                "posted_at": None,
+            },
+        ]
+    )
 
     result = mock_fetcher.get_announcements()
     assert result == {"CPEN 311": []}
 
 
 # --- Invalid response type (covers: if not isinstance(data, list)) ---
-@patch(PATCH_GET)
-def test_invalid_response_type(mock_get, mock_fetcher):
+def test_invalid_response_type(fake_get, mock_fetcher):
     mock_fetcher.token = "token"
     mock_fetcher.course_ids = [123]
     mock_fetcher.course_names = {123: "CPEN 311"}
 
-    mock_get.return_value.json.return_value = {}  # not a list
+    fake_get.return_value.headers = {}
+    fake_get.return_value.content = orjson.dumps({})  # not a list
 
     result = mock_fetcher.get_announcements()
     assert result == {}
@@ -1,63 +1,81 @@
-from unittest.mock import MagicMock, mock_open, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, mock_open
 
+import pytest
+
+from Backend.announcement_feature import announcement_main
 from Backend.announcement_feature.announcement_main import (
     main,  # rename to actual file path, e.g. Backend.announcement_feature.main
 )
 
-# Use a fixed patch target for consistent mocking
-PATCH_FETCHER = "Backend.announcement_feature.announcement_main.AnnouncementFetcher"
-PATCH_PARSER = "Backend.announcement_feature.announcement_main.AnnouncementParser"
-PATCH_OPEN = "builtins.open"
-PATCH_ENV = "Backend.announcement_feature.announcement_main.os.getenv"
-PATCH_DOTENV = "Backend.announcement_feature.announcement_main.load_dotenv"
+# ---- Fixtures ----
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _patched_ann_main():
+    """Swap the collaborators of announcement_main once for the whole module."""
+    mocks = SimpleNamespace(
+        AnnouncementFetcher=MagicMock(),
+        AnnouncementParser=MagicMock(),
+        load_dotenv=MagicMock(),
+        open=mock_open(),
+    )
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in vars(mocks).items():
+            # main() looks `open` up through module globals before builtins
+            mp.setattr(announcement_main, name, value, raising=False)
+        yield mocks
+
+
+@pytest.fixture
+def patched(_patched_ann_main):
+    _patched_ann_main.AnnouncementFetcher.reset_mock(return_value=True)
+    _patched_ann_main.AnnouncementParser.reset_mock(return_value=True)
+    _patched_ann_main.load_dotenv.reset_mock()
+    _patched_ann_main.open.reset_mock()
+    return _patched_ann_main
 
 
 # ---- 1. Token is None → loads from dotenv ----
-@patch(PATCH_FETCHER)
-@patch(PATCH_DOTENV)
-@patch(PATCH_ENV, return_value="FAKE_TOKEN")
-def test_loads_env_token(mock_env, mock_dotenv, mock_fetcher):
+def test_loads_env_token(patched, monkeypatch):
+    mock_env = MagicMock(return_value="FAKE_TOKEN")
+    # os.getenv is process-wide, so it is only swapped for this one test
+    monkeypatch.setattr(announcement_main.os, "getenv", mock_env)
     mock_instance = MagicMock()
     mock_instance.get_announcements.return_value = {}
-    mock_fetcher.return_value = mock_instance
+    patched.AnnouncementFetcher.return_value = mock_instance
 
     result = main(None)
-    mock_dotenv.assert_called_once()
+    patched.load_dotenv.assert_called_once()
     mock_env.assert_called_once_with("CANVAS_TOKEN")
     assert result == []
 
 
 # ---- 2. No announcements found ----
-@patch(PATCH_FETCHER)
-def test_returns_empty_when_no_announcements(mock_fetcher):
+def test_returns_empty_when_no_announcements(patched):
     mock_instance = MagicMock()
     mock_instance.get_announcements.return_value = {}
-    mock_fetcher.return_value = mock_instance
+    patched.AnnouncementFetcher.return_value = mock_instance
 
     result = main("token")
     assert result == []
 
 
 # ---- 3. Announcement mentions midterm but also grades → skipped ----
-@patch(PATCH_PARSER)
-@patch(PATCH_FETCHER)
-@patch(PATCH_OPEN, new_callable=mock_open)
-def test_skips_grade_related_midterm(mock_openfile, mock_fetcher, mock_parser):
-    mock_fetcher.return_value.get_announcements.return_value = {
+def test_skips_grade_related_midterm(patched):
+    patched.AnnouncementFetcher.return_value.get_announcements.return_value = {
         "CPEN_V 311 101 2025W1 Digital": [
             {"message": "Midterm grades are out!", "posted_at": "2025-10-10T00:00:00Z"}
         ]
     }
     result = main("token")
     assert result == []  # nothing parsed
+    patched.AnnouncementParser.extract_midterm_dates_batch.assert_not_called()
 
 
 # ---- 4. Valid midterm announcement → produces event ----
-@patch(PATCH_PARSER)
-@patch(PATCH_FETCHER)
-@patch(PATCH_OPEN, new_callable=mock_open)
-def test_extracts_midterm_and_builds_event(mock_openfile, mock_fetcher, mock_parser):
-    mock_fetcher.return_value.get_announcements.return_value = {
+def test_extracts_midterm_and_builds_event(patched):
+    patched.AnnouncementFetcher.return_value.get_announcements.return_value = {
         "CPEN_V 311 101 2025W1 Digital": [
             {
                 "message": "Midterm is on 2025-10-23 at 15:00.",
@@ -65,9 +83,11 @@ def test_extracts_midterm_and_builds_event(mock_openfile, mock_fetcher, mock_par
             }
         ]
     }
-    mock_parser.extract_midterm_dates.return_value = "2025-10-23T15:00:00"
+    patched.AnnouncementParser.extract_midterm_dates_batch.return_value = {
+        "CPEN_V 311 101 2025W1 Digital": "2025-10-23T15:00:00"
+    }
 
-    result = main("token")
+    result = main("token", debug=True)
     assert len(result) == 1
     event = result[0]
     assert event["course"] == "CPEN 311"
@@ -77,17 +97,32 @@ def test_extracts_midterm_and_builds_event(mock_openfile, mock_fetcher, mock_par
     assert event["date"] == "2025/10/23"
 
     # file writing verified
-    mock_openfile.assert_called_once_with("midterm_dates.json", "w")
-    handle = mock_openfile()
+    patched.open.assert_called_once_with("midterm_dates.json", "w")
+    handle = patched.open()
     handle.write.assert_called()
 
 
+# ---- 4b. Without debug nothing is written ----
+def test_no_file_written_without_debug(patched):
+    patched.AnnouncementFetcher.return_value.get_announcements.return_value = {
+        "CPEN_V 311 101 2025W1 Digital": [
+            {
+                "message": "Midterm is on 2025-10-23 at 15:00.",
+                "posted_at": "2025-09-15T08:00:00Z",
+            }
+        ]
+    }
+    patched.AnnouncementParser.extract_midterm_dates_batch.return_value = {
+        "CPEN_V 311 101 2025W1 Digital": "2025-10-23T15:00:00"
+    }
+
+    assert len(main("token")) == 1
+    patched.open.assert_not_called()
+
+
 # ---- 5. Parser returns None → no events added ----
-@patch(PATCH_PARSER)
-@patch(PATCH_FETCHER)
-@patch(PATCH_OPEN, new_callable=mock_open)
-def test_parser_returns_none(mock_openfile, mock_fetcher, mock_parser):
-    mock_fetcher.return_value.get_announcements.return_value = {
+def test_parser_returns_none(patched):
+    patched.AnnouncementFetcher.return_value.get_announcements.return_value = {
         "CPEN_V 391 102 2025W1 Systems": [
             {
                 "message": "Midterm details coming soon.",
@@ -95,17 +130,16 @@ def test_parser_returns_none(mock_openfile, mock_fetcher, mock_parser):
             }
         ]
     }
-    mock_parser.extract_midterm_dates.return_value = None
+    patched.AnnouncementParser.extract_midterm_dates_batch.return_value = {
+        "CPEN_V 391 102 2025W1 Systems": None
+    }
     result = main("token")
     assert result == []
 
 
 # ---- 6. Midnight time → uses 12:00 / 1:00 branch ----
-@patch(PATCH_PARSER)
-@patch(PATCH_FETCHER)
-@patch(PATCH_OPEN, new_callable=mock_open)
-def test_midnight_time_branches(mock_openfile, mock_fetcher, mock_parser):
-    mock_fetcher.return_value.get_announcements.return_value = {
+def test_midnight_time_branches(patched):
+    patched.AnnouncementFetcher.return_value.get_announcements.return_value = {
         "CPEN_V 391 102 2025W1 Systems": [
             {
                 "message": "Midterm is on 2025-10-20.",
@@ -113,7 +147,35 @@ def test_midnight_time_branches(mock_openfile, mock_fetcher, mock_parser):
             }
         ]
     }
-    mock_parser.extract_midterm_dates.return_value = "2025-10-20T00:00:00"
+    patched.AnnouncementParser.extract_midterm_dates_batch.return_value = {
+        "CPEN_V 391 102 2025W1 Systems": "2025-10-20T00:00:00"
+    }
     result = main("token")
     assert result[0]["begin_date_time"] == "12:00:00"
     assert result[0]["end_date_time"] == "1:00:00"
+
+
+# ---- 7. All courses go to the parser in one batch ----
+def test_single_batch_call_for_all_courses(patched):
+    patched.AnnouncementFetcher.return_value.get_announcements.return_value = {
+        "CPEN_V 311 101 2025W1 Digital": [
+            {"message": "Welcome to the course!", "posted_at": "2025-09-01T08:00:00Z"},
+            {"message": "Midterm is on Oct 23.", "posted_at": "2025-09-15T08:00:00Z"},
+        ],
+        "CPEN_V 391 102 2025W1 Systems": [
+            {"message": "Midterm is on Oct 20.", "posted_at": "2025-09-20T10:00:00Z"}
+        ],
+    }
+    patched.AnnouncementParser.extract_midterm_dates_batch.return_value = {
+        "CPEN_V 311 101 2025W1 Digital": "2025-10-23T15:00:00",
+        "CPEN_V 391 102 2025W1 Systems": "2025-10-20T09:30:00",
+    }
+
+    result = main("token")
+    patched.AnnouncementParser.extract_midterm_dates_batch.assert_called_once()
+    (entries,) = patched.AnnouncementParser.extract_midterm_dates_batch.call_args.args
+    assert [e["course"] for e in entries] == [
+        "CPEN_V 311 101 2025W1 Digital",
+        "CPEN_V 391 102 2025W1 Systems",
+    ]
+    assert [e["course"] for e in result] == ["CPEN 311", "CPEN 391"]
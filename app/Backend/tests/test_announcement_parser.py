@@ -1,45 +1,60 @@
-from unittest.mock import MagicMock, patch
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
 
+import pytest
+
+from Backend.announcement_feature import announcement_parser
 from Backend.announcement_feature.announcement_parser import AnnouncementParser
 
 PATCH_CLIENT = "Backend.announcement_feature.announcement_parser.OpenAI"
 
 
+@pytest.fixture(autouse=True)
+def openai_stub(mocker):
+    """
+    Patch OpenAI with one prebuilt client; tests only set `resp.output_text`.
+
+    The client is cached module-wide, so the cache is cleared around each test
+    to rebuild it from the patched OpenAI.
+    """
+    client = Mock(spec_set=["responses"])
+    client.responses = Mock(spec_set=["create"])
+    resp = SimpleNamespace(output_text="")
+    client.responses.create.return_value = resp
+    mocker.patch(PATCH_CLIENT, return_value=client)
+    announcement_parser._get_client.cache_clear()
+    yield client, resp
+    announcement_parser._get_client.cache_clear()
+
+
 # ---- 1. No midterm mention → early return (covers: if not midterm_sentences) ----
-@patch(PATCH_CLIENT)
-def test_returns_none_when_no_midterm(mock_openai):
+def test_returns_none_when_no_midterm(openai_stub):
     """Should return None when no 'midterm' is found."""
-    mock_openai.return_value = MagicMock()  # avoid needing a real key
+    client, _ = openai_stub  # avoid needing a real key
     text = "Reminder: project report due next week. See syllabus."
     result = AnnouncementParser.extract_midterm_dates(text, "2025-10-01T12:00:00Z")
     assert result is None
+    client.responses.create.assert_not_called()
 
 
 # ---- 2. Normal OpenAI call path ----
-@patch(PATCH_CLIENT)
-def test_calls_openai_and_returns_output(mock_openai):
-    mock_client = MagicMock()
-    mock_response = MagicMock()
+def test_calls_openai_and_returns_output(openai_stub):
+    mock_client, mock_response = openai_stub
     mock_response.output_text = "2025-10-23T15:00"
-    mock_client.responses.create.return_value = mock_response
-    mock_openai.return_value = mock_client
 
     text = "Midterm is on October 23 at 3 PM!"
     result = AnnouncementParser.extract_midterm_dates(text, "2025-10-01T12:00:00Z")
 
-    mock_openai.assert_called_once()
+    assert announcement_parser._get_client() is mock_client
     mock_client.responses.create.assert_called_once()
     assert result == "2025-10-23T15:00"
 
 
 # ---- 3. Strip output text ----
-@patch(PATCH_CLIENT)
-def test_strips_output_text(mock_openai):
-    mock_client = MagicMock()
-    mock_response = MagicMock()
+def test_strips_output_text(openai_stub):
+    _, mock_response = openai_stub
     mock_response.output_text = "   2025-11-02   "
-    mock_client.responses.create.return_value = mock_response
-    mock_openai.return_value = mock_client
 
     text = "Midterm is on November 2."
     result = AnnouncementParser.extract_midterm_dates(text, "2025-10-01T12:00:00Z")
@@ -47,13 +62,9 @@ def test_strips_output_text(mock_openai):
 
 
 # ---- 4. Prompt formatting ----
-@patch(PATCH_CLIENT)
-def test_prompt_contains_posted_at_and_sentence(mock_openai):
-    mock_client = MagicMock()
-    mock_response = MagicMock()
+def test_prompt_contains_posted_at_and_sentence(openai_stub):
+    mock_client, mock_response = openai_stub
     mock_response.output_text = "2025-10-23"
-    mock_client.responses.create.return_value = mock_response
-    mock_openai.return_value = mock_client
 
     text = "Midterm will be held October 23."
     posted_at = "2025-09-15T08:00:00Z"
@@ -68,16 +79,98 @@ def test_prompt_contains_posted_at_and_sentence(mock_openai):
 
 
 # ---- 5. Multiple midterm sentences ----
-@patch(PATCH_CLIENT)
-def test_multiple_midterm_sentences(mock_openai):
+def test_multiple_midterm_sentences(openai_stub):
     text = "Midterm 1 on Feb 1. Midterm 2 on Mar 3!"
-    mock_client = MagicMock()
-    mock_response = MagicMock()
+    mock_client, mock_response = openai_stub
     mock_response.output_text = "2025-02-01"
-    mock_client.responses.create.return_value = mock_response
-    mock_openai.return_value = mock_client
 
     result = AnnouncementParser.extract_midterm_dates(text, "2025-01-01T00:00:00Z")
     assert result == "2025-02-01"
     joined = mock_client.responses.create.call_args.kwargs["input"]
     assert "Midterm 1" in joined and "Midterm 2" in joined
+
+
+# ---- 6. Batch: one call covers every course ----
+def test_batch_single_call_returns_mapping(openai_stub):
+    mock_client, mock_response = openai_stub
+    mock_response.output_text = json.dumps(
+        {"CPEN 311": " 2025-10-23T15:00 ", "CPEN 391": None}
+    )
+
+    entries = [
+        {
+            "course": "CPEN 311",
+            "posted_at": "2025-09-15T08:00:00Z",
+            "message": "Midterm is on Oct 23.",
+        },
+        {
+            "course": "CPEN 391",
+            "posted_at": "2025-09-16T08:00:00Z",
+            "message": "Midterm date TBD.",
+        },
+        {
+            "course": "CPEN 331",
+            "posted_at": "2025-09-17T08:00:00Z",
+            "message": "No class today.",
+        },
+    ]
+    result = AnnouncementParser.extract_midterm_dates_batch(entries)
+
+    mock_client.responses.create.assert_called_once()
+    kwargs = mock_client.responses.create.call_args.kwargs
+    assert kwargs["text"] == {"format": {"type": "json_object"}}
+    assert "[CPEN 311] Posted at 2025-09-15T08:00:00Z" in kwargs["input"]
+    assert "CPEN 331" not in kwargs["input"]
+    assert result == {"CPEN 311": "2025-10-23T15:00", "CPEN 391": None}
+
+
+# ---- 6b. Batch: unusable answer → per-course fallback ----
+@pytest.mark.parametrize(
+    "output_text", ["not json", "[]", json.dumps({"CPEN 391": None})]
+)
+def test_batch_falls_back_per_course(openai_stub, output_text):
+    mock_client, _ = openai_stub
+    batch = SimpleNamespace(output_text=output_text)
+    single = SimpleNamespace(output_text="2025-10-23")
+    mock_client.responses.create.side_effect = [batch, single]
+
+    entries = [
+        {
+            "course": "CPEN 311",
+            "posted_at": "2025-09-15T08:00:00Z",
+            "message": "Midterm is on Oct 23.",
+        },
+    ]
+    result = AnnouncementParser.extract_midterm_dates_batch(entries)
+
+    assert result == {"CPEN 311": "2025-10-23"}
+    assert mock_client.responses.create.call_count == 2
+
+
+# ---- 7. Batch: nothing mentions midterm → no API call ----
+def test_batch_no_midterm_skips_call(openai_stub):
+    entries = [
+        {
+            "course": "CPEN 311",
+            "posted_at": "2025-09-15T08:00:00Z",
+            "message": "Lab 2 posted.",
+        }
+    ]
+    assert AnnouncementParser.extract_midterm_dates_batch(entries) == {}
+    announcement_parser.OpenAI.assert_not_called()
+
+
+# ---- 8. Client is built once and reused ----
+def test_client_reused_across_calls(openai_stub):
+    client, resp = openai_stub
+    resp.output_text = "2025-10-23"
+
+    AnnouncementParser.extract_midterm_dates(
+        "Midterm on Oct 23.", "2025-10-01T12:00:00Z"
+    )
+    AnnouncementParser.extract_midterm_dates(
+        "Midterm on Oct 24.", "2025-10-01T12:00:00Z"
+    )
+
+    announcement_parser.OpenAI.assert_called_once()
+    assert client.responses.create.call_count == 2
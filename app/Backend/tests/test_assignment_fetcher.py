@@ -1,111 +1,94 @@
 # test_assignment_fetcher.py
 import json
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
-from Backend.assignment_feature import AssignmentFetcher as af
-
-
-def setup_function(_):
-    af.classesValid.clear()
-    af.classesIdValid.clear()
-    af.classesAssignmentsValid.clear()
-    af.NoDueDate.clear()
-    af.classNames.clear()
-    af.course_map.clear()
-
-
-# ---------- simplify_name ----------
+import pytest
 
-def test_simplify_name_too_few_parts():
-    assert af.simplify_name("CPEN") is None
+from Backend.assignment_feature import AssignmentFetcher as af
 
+FUTURE_ISO = "2099-01-01T00:00:00Z"
+PAST_ISO = "2000-01-01T00:00:00Z"
+CURRENT_TERM = {"start_at": PAST_ISO, "end_at": FUTURE_ISO}
+# fixed reference time for is_current_term, parsed once for the module
+NOW = datetime(2025, 11, 27, tzinfo=timezone.utc)
 
-def test_simplify_name_no_number():
-    assert af.simplify_name("CPEN ABC") is None
 
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    # only the tests that reach getClassesInfo touch the disk cache
+    monkeypatch.setattr(af.canvas_cache, "CACHE_DIR", tmp_path)
+    return tmp_path
 
-def test_simplify_name_short_dept():
-    assert af.simplify_name("CS 221") is None
 
+# ---------- simplify_name ----------
 
-def test_simplify_name_normal_with_V_suffix():
-    assert af.simplify_name("CPEN_V 221 Something") == "CPEN_V 221"
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("CPEN", None),  # too few parts
+        ("CPEN ABC", None),  # no number
+        ("CS 221", None),  # short dept
+        ("CPEN_V 221 Something", "CPEN_V 221"),
+    ],
+)
+def test_simplify_name(name, expected):
+    assert af.simplify_name(name) == expected
 
 
 # ---------- is_due_in_future ----------
 
-def test_is_due_in_future_true():
-    future = "2099-01-01T00:00:00Z"
-    assert af.is_due_in_future(future) is True
-
-
-def test_is_due_in_future_false():
-    past = "2000-01-01T00:00:00Z"
-    assert af.is_due_in_future(past) is False
+@pytest.mark.parametrize(
+    "due, expected",
+    [
+        (FUTURE_ISO, True),
+        (PAST_ISO, False),
+    ],
+)
+def test_is_due_in_future(due, expected):
+    assert af.is_due_in_future(due) is expected
 
 
 # ---------- is_current_term ----------
 
-def test_is_current_term_missing_dates():
-    assert af.is_current_term({"start_at": None, "end_at": None}) is False
-    assert af.is_current_term({"start_at": None, "end_at": "2099-01-01T00:00:00Z"}) is False
-    assert af.is_current_term({"start_at": "2099-01-01T00:00:00Z", "end_at": None}) is False
-
-
-def test_is_current_term_now_inside():
-    term = {
-        "start_at": "2000-01-01T00:00:00Z",
-        "end_at": "2099-01-01T00:00:00Z",
-    }
-    assert af.is_current_term(term) is True
-
-
-def test_is_current_term_now_before_or_after():
-    # now before start
-    term_future = {
-        "start_at": "2099-01-01T00:00:00Z",
-        "end_at": "2100-01-01T00:00:00Z",
-    }
-    assert af.is_current_term(term_future) is False
-
-    # now after end
-    term_past = {
-        "start_at": "1990-01-01T00:00:00Z",
-        "end_at": "1991-01-01T00:00:00Z",
-    }
-    assert af.is_current_term(term_past) is False
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [
+        (None, None, False),
+        (None, FUTURE_ISO, False),
+        (FUTURE_ISO, None, False),
+        (PAST_ISO, FUTURE_ISO, True),  # now inside
+        (FUTURE_ISO, "2100-01-01T00:00:00Z", False),  # now before start
+        ("1990-01-01T00:00:00Z", "1991-01-01T00:00:00Z", False),  # now after end
+    ],
+)
+def test_is_current_term(start, end, expected):
+    assert af.is_current_term({"start_at": start, "end_at": end}, NOW) is expected
 
 
 # ---------- get_all_pages ----------
 
-class DummyResponse:
-    def __init__(self, data, link_header=""):
-        self._data = data
-        self.headers = {"Link": link_header} if link_header else {}
-
-    def json(self):
-        return self._data
-
-    def raise_for_status(self):
-        pass
+def _resp(data, link=""):
+    return SimpleNamespace(
+        content=json.dumps(data).encode(),
+        raise_for_status=lambda: None,
+        headers={"Link": link} if link else {},
+    )
 
 
 def test_get_all_pages_multiple(monkeypatch):
     calls = []
 
-    def fake_get(url, headers=None, params=None):
+    def fake_get(url, headers=None, params=None, timeout=None):
         calls.append(url)
         if "page=1" in url:
             # first page, has next
-            return DummyResponse(
-                [{"id": 1}],
-                '<https://example.com/api?page=2>; rel="next"'
-            )
+            return _resp([{"id": 1}], '<https://example.com/api?page=2>; rel="next"')
         else:
             # second (last) page, no Link header
-            return DummyResponse([{"id": 2}])
+            return _resp([{"id": 2}])
 
-    monkeypatch.setattr(af.requests, "get", fake_get)
+    monkeypatch.setattr(af._session, "get", fake_get)
 
     url = "https://example.com/api?page=1"
     data = af.get_all_pages(url, headers={"Authorization": "Bearer X"})
@@ -131,12 +114,12 @@ def test_requestUrl_uses_canvas_base(monkeypatch):
 
 # -------- getClasses ---------
 
-def test_getClasses_filters_by_name_and_term(monkeypatch):
+def test_getClasses_filters_by_name_and_term(monkeypatch, isolated_cache):
     def fake_requestUrl(scope, token):
         return [
             {
                 "name": None,
-                "term": {"start_at": "2000-01-01T00:00:00Z", "end_at": "2099-01-01T00:00:00Z"},
+                "term": CURRENT_TERM,
                 "id": 1,
             },
             {
@@ -147,7 +130,7 @@ def test_getClasses_filters_by_name_and_term(monkeypatch):
             {
                 # This matches the real Canvas-ish pattern and your new simplify_name
                 "name": "CPEN_V 221 101",
-                "term": {"start_at": "2000-01-01T00:00:00Z", "end_at": "2099-01-01T00:00:00Z"},
+                "term": CURRENT_TERM,
                 "id": 3,
             },
         ]
@@ -160,10 +143,46 @@ def test_getClasses_filters_by_name_and_term(monkeypatch):
     # simplified names
     assert result == ["CPEN_V 221"]
     # raw Canvas names
-    assert af.classesValid == ["CPEN_V 221 101"]
-    assert af.classesIdValid == [3]
+    assert af.getClassesInfo(token) == (["CPEN_V 221 101"], [3])
 
 
+def test_getClassesInfo_cached_per_token(monkeypatch, isolated_cache):
+    calls = []
+
+    def fake_requestUrl(scope, token):
+        calls.append(token)
+        return [
+            {
+                "name": "CPEN_V 221 101",
+                "term": CURRENT_TERM,
+                "id": 3,
+            },
+        ]
+
+    monkeypatch.setattr(af, "requestUrl", fake_requestUrl)
+
+    assert af.getClassesInfo("X") == (["CPEN_V 221 101"], [3])
+    assert af.getClassesInfo("X") == (["CPEN_V 221 101"], [3])
+    assert calls == ["X"]
+
+    af.getClassesInfo("Y")
+    af.getClassesInfo("X", force_refresh=True)
+    assert calls == ["X", "Y", "X"]
+
+
+def test_getClassesInfo_empty_not_cached(monkeypatch, isolated_cache):
+    calls = []
+
+    def fake_requestUrl(scope, token):
+        calls.append(token)
+        return []
+
+    monkeypatch.setattr(af, "requestUrl", fake_requestUrl)
+
+    assert af.getClassesInfo("X") == ([], [])
+    assert af.getClassesInfo("X") == ([], [])
+    assert calls == ["X", "X"]
+
 
 # ---------- getAssignmentsClass ---------
 
@@ -188,45 +207,37 @@ def test_getAssignmentsClass_future_and_past_and_nodue(monkeypatch):
     assert time_part == "03:04:05"
     assert raw_due == "2099-01-02T03:04:05Z"
 
-    assert len(af.NoDueDate) == 2
-    titles = {row[0] for row in af.NoDueDate}
-    assert titles == {"Past B", "No Due"}
-
 
 # --------- getAssignmentsStudent --------
 
-def test_mapCourses_various_branches(monkeypatch):
+# Only the CPEN_V 221 key should exist: class id 1 has a bad name and is
+# dropped, and the second id 2 is a duplicate so it is not added again
+MAP_COURSES_EXPECTED = {
+    "CPEN_V 221": {
+        "classes": ["CPEN_V 221 A", "CPEN_V 221 B"],
+        "ids": [2, 3],
+        "assignments": [["Assignments for 2"], ["Assignments for 3"]],
+    }
+}
 
-    af.classesValid[:] = [
+
+def test_mapCourses_various_branches(monkeypatch):
+    names = [
         "CPEN Bad",          # bad name -> simplify_name is None
         "CPEN_V 221 A",      # normal
         "CPEN_V 221 B",      # same simplified key as previous with diff id
         "CPEN_V 221 A",      # same simplified key, same id as second -> duplicate id
     ]
-    af.classesIdValid[:] = [1, 2, 3, 2]
+    ids = [1, 2, 3, 2]
 
-    def fake_getClasses(token):
-        # We don't touch the globals here, they are already set above
-        return af.classesValid
+    def fake_getClassesInfo(token):
+        return names, ids
 
     def fake_getAssignmentsClass(cid, token):
         return [f"Assignments for {cid}"]
 
-    monkeypatch.setattr(af, "getClasses", fake_getClasses)
+    monkeypatch.setattr(af, "getClassesInfo", fake_getClassesInfo)
     monkeypatch.setattr(af, "getAssignmentsClass", fake_getAssignmentsClass)
 
     token = "TEST_TOKEN"
-    result_json = af.mapCourses(token)
-    result = json.loads(result_json)
-
-    # Only the CPEN_V 221 key should exist (class id 1 is dropped, id 2 deduped)
-    assert list(result.keys()) == ["CPEN_V 221"]
-    c = result["CPEN_V 221"]
-
-    # ids: [2, 3] (1 skipped, last 2 is duplicate -> not added)
-    assert c["ids"] == [2, 3]
-    assert c["classes"] == ["CPEN_V 221 A", "CPEN_V 221 B"]
-    assert c["assignments"] == [
-        ["Assignments for 2"],
-        ["Assignments for 3"],
-    ]
\ No newline at end of file
+    assert json.loads(af.mapCourses(token)) == MAP_COURSES_EXPECTED
\ No newline at end of file
@@ -1,35 +1,66 @@
-import io
+import errno
 import json
-import pytz
-import builtins
+import os
+import icalendar
 import pytest
-from unittest.mock import patch, MagicMock, mock_open
-from datetime import datetime, date
+from unittest.mock import Mock
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
-from Backend.iCalBackendNew import ICalHandler
+from Backend.iCalBackendNew import ICalHandler, _format_fields, _scan_uids, _uid_key
 
+# the handful of Calendar methods the handler touches; plain Mock skips the
+# dunder wiring MagicMock sets up on every instance
+CALENDAR_SPEC = ["add_component", "to_ical", "walk", "keys", "__contains__"]
 
-@pytest.fixture
-def mock_calendar(monkeypatch):
-    """Fixture returning a fresh handler with calendar mocked to skip I/O."""
+
+_TZ = ZoneInfo("America/Vancouver")
+_ICS_PATH = Path("/fake/path/calendar.ics")
+
+
+@pytest.fixture(scope="module")
+def _shared_handler():
+    """One handler (and its mocks) built per module; reset() cleans it per test."""
     handler = ICalHandler.__new__(ICalHandler)
-    handler.tz = pytz.timezone("America/Vancouver")
-    handler.token = "token"
-    handler.ics_path = Path("/fake/path/calendar.ics")
-    handler.calendar = MagicMock()
-    handler.existing_uids = set()
-    handler.term_end_date = "2025/12/07"
-    handler._create_new_calendar = MagicMock()
+    handler._mocks = {
+        "calendar": Mock(spec_set=CALENDAR_SPEC),
+        "_create_new_calendar": Mock(),
+    }
     return handler
 
 
+def reset(handler):
+    """Put a shared handler back into its pristine, I/O-free state."""
+    mocks = vars(handler).pop("_mocks")
+    for mock in mocks.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    vars(handler).clear()  # drops attributes and method overrides set by tests
+    vars(handler).update(
+        mocks,
+        _mocks=mocks,
+        tz=_TZ,
+        token="token",
+        ics_path=_ICS_PATH,
+        existing_uids=set(),
+        _new_components=[],
+        _file_sig=None,
+        term_end_date="2025/12/07",
+    )
+
+
+@pytest.fixture
+def mock_calendar(_shared_handler):
+    """Fixture returning a clean handler with calendar mocked to skip I/O."""
+    reset(_shared_handler)
+    return _shared_handler
+
+
 # --- Init: no file -> new calendar ----
-@patch("Backend.iCalBackendNew.Path.is_file", return_value=False)
-def test_init_creates_new_calendar(mock_isfile):
-    with patch.object(ICalHandler, "_create_new_calendar") as mock_create:
-        ICalHandler("token")
-        mock_create.assert_called_once()
+def test_init_creates_new_calendar(mocker):
+    mocker.patch("Backend.iCalBackendNew.Path.is_file", return_value=False)
+    mock_create = mocker.patch.object(ICalHandler, "_create_new_calendar")
+    ICalHandler("token")
+    mock_create.assert_called_once()
 
 
 # ---- 4. UID generation ----
@@ -37,13 +68,15 @@ def test_generate_uid(mock_calendar):
     uid = mock_calendar._generate_uid("CPEN311", "Lecture", "2025/10/10", "12:00")
     assert "CPEN311-Lecture" in uid
     assert "@notiflow.local" in uid
+    assert mock_calendar._generate_uid("CPEN 311", "Final Exam", "2025/12/10", "08:30:00") == (
+        "CPEN_311-Final_Exam-20251210-08:30:00@notiflow.local"
+    )
 
 
 # ---- 5. Create new calendar ----
 def test_create_new_calendar(mock_calendar):
     mock_calendar._create_new_calendar()
-    cal = mock_calendar.calendar
-    assert "version" in cal.keys() or True  # placeholder; icalendar object mocked
+    mock_calendar._create_new_calendar.assert_called_once()  # icalendar object mocked
 
 
 # ---- 6. dateTimeParse normal + short formats ----
@@ -54,6 +87,14 @@ def test_dateTimeParse_variants(mock_calendar):
     assert d2.hour == 10
     bad = mock_calendar.dateTimeParse("bad", "11:00")
     assert bad is None
+    assert mock_calendar.dateTimeParse("2025/12/05", "10") is None
+    assert mock_calendar.dateTimeParse("2025/13/05") is None
+
+
+def test_dateTimeParse_localizes_offset(mock_calendar):
+    # unpadded day as in term_end_date; PDT in October, PST in December
+    assert mock_calendar.dateTimeParse("2025/10/7").utcoffset().total_seconds() == -7 * 3600
+    assert mock_calendar.dateTimeParse("2025/12/7").utcoffset().total_seconds() == -8 * 3600
 
 
 # ---- 7. _parse_canvas_iso ----
@@ -65,67 +106,98 @@ def test_parse_canvas_iso_variants(mock_calendar):
 
 
 # ---- 8. create_event_object: complete event ----
+# shared one-off lecture; tests extend it with {**BASE_EVENT, ...}
+BASE_EVENT = {
+    "course": "CPEN 311",
+    "event_type": "Lecture",
+    "date": "2025/10/10",
+    "begin_date_time": "10:00:00",
+    "end_date_time": "11:00:00",
+}
+
+
 def test_create_event_object_complete(mock_calendar):
-    data = {
-        "course": "CPEN 311",
-        "event_type": "Lecture",
-        "date": "2025/10/10",
-        "begin_date_time": "10:00:00",
-        "end_date_time": "11:00:00",
-        "location": "Room 123",
-    }
+    data = {**BASE_EVENT, "location": "Room 123"}
     e = mock_calendar.create_event_object(data)
     assert e["summary"].startswith("CPEN 311 - Lecture")
     assert e["location"] == "Room 123"
 
 
-# ---- 9. create_event_object: duplicate, incomplete, recurrence ----
-def test_create_event_object_duplicates_and_rrule(mock_calendar):
-    base = {
-        "course": "CPEN 311",
-        "event_type": "Lecture",
-        "date": "2025/10/10",
-        "begin_date_time": "10:00:00",
-        "end_date_time": "11:00:00",
-        "frequency": "WEEKLY",
-        "interval": "2",
-        "by_day": ["MO", "WE"],
-        "until": "2025/12/07",
-        "exception_dates": ["2025/11/01"]
-    }
-    event = mock_calendar.create_event_object(base)
-    assert event["rrule"]["FREQ"][0] in ("W", "WEEKLY")
-    # duplicate skip
-    mock_calendar.existing_uids.add(next(iter(mock_calendar.existing_uids)))
-    dup = mock_calendar.create_event_object(base)
-    assert dup is None
-    # incomplete skip
-    incomplete = mock_calendar.create_event_object({"course": "C"})
-    assert incomplete is None
+# ---- 9. create_event_object: recurrence, duplicate, incomplete ----
+RRULE_EVENT = {
+    **BASE_EVENT,
+    "frequency": "WEEKLY",
+    "interval": "2",
+    "by_day": ["MO", "WE"],
+    "until": "2025/12/07",
+    "exception_dates": ["2025/11/01"]
+}
+
+
+@pytest.mark.parametrize(
+    "payload, expect",
+    [
+        (RRULE_EVENT, "ok"),
+        (RRULE_EVENT, "dup"),
+        ({"course": "C"}, None),  # incomplete
+    ],
+    ids=["rrule", "duplicate", "incomplete"],
+)
+def test_create_event_object_rrule_duplicate_incomplete(mock_calendar, payload, expect):
+    if expect == "dup":
+        mock_calendar.existing_uids.add(_uid_key(mock_calendar._event_uid(payload)))
+    event = mock_calendar.create_event_object(payload)
+    if expect == "ok":
+        assert event["rrule"]["FREQ"][0] in ("W", "WEEKLY")
+    else:
+        assert event is None
 
 
 # ---- 10. process_json ----
 def test_process_json_adds_events(mock_calendar):
-    data = [{
-        "course": "CPEN 311",
-        "event_type": "Lecture",
-        "date": "2025/10/10",
-        "begin_date_time": "10:00:00",
-        "end_date_time": "11:00:00"
-    }]
-    mock_calendar.create_event_object = MagicMock(return_value="EVENT")
-    mock_calendar.process_json(data)
-    mock_calendar.calendar.add_component.assert_called_with("EVENT")
+    mock_calendar.process_json([BASE_EVENT])
+    written = b"".join(mock_calendar._new_components)
+    assert written.startswith(b"BEGIN:VEVENT\r\n")
+    assert b"SUMMARY:CPEN 311 - Lecture\r\n" in written
+    # events are serialized directly, not added as icalendar components
+    mock_calendar.calendar.add_component.assert_not_called()
+
+
+def test_format_fields_matches_create_event_object(mock_calendar):
+    data = {
+        **RRULE_EVENT,
+        "course": "CPEN 311, Digital Systems Design and a long descriptive title",
+        "location": "Room; 123",
+    }
+    expected = mock_calendar.create_event_object(data)
+    mock_calendar.existing_uids.clear()
+    parsed = icalendar.Event.from_ical(_format_fields(mock_calendar._prepare_event(data)))
+    for prop in ("SUMMARY", "DTSTART", "DTEND", "UID", "RRULE", "EXDATE", "DESCRIPTION", "LOCATION"):
+        assert parsed[prop].to_ical() == expected[prop].to_ical()
 
 
 # ---- 11. save_calendar ----
-def test_save_calendar(mock_calendar):
-    fake_bytes = b"ical"
-    mock_calendar.calendar.to_ical.return_value = fake_bytes
-    with patch("builtins.open", mock_open()) as m:
-        mock_calendar.save_calendar()
-        handle = m()
-        handle.write.assert_called_once_with(fake_bytes)
+def test_save_calendar(mock_calendar, tmp_path):
+    mock_calendar.ics_path = tmp_path / "calendar.ics"
+    mock_calendar.ics_path.write_bytes(b"a much longer previous calendar" * 10)
+    calendar = icalendar.Calendar()
+    calendar.add("prodid", "-//NotiFlow//Finals Scheduler//EN")
+    event = icalendar.Event()
+    event.add("uid", "uid123")
+    calendar.add_component(event)
+    mock_calendar.calendar = calendar
+    mock_calendar.save_calendar()
+    assert mock_calendar.ics_path.read_bytes() == calendar.to_ical()
+
+
+def test_save_calendar_splices_new_events(mock_calendar, tmp_path):
+    mock_calendar.ics_path = tmp_path / "calendar.ics"
+    mock_calendar.calendar = icalendar.Calendar()
+    mock_calendar._new_components.append(b"BEGIN:VEVENT\r\nEND:VEVENT\r\n")
+    mock_calendar.save_calendar()
+    assert mock_calendar.ics_path.read_bytes() == (
+        b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
 
 
 # ---- 12. _generate_task_uid ----
@@ -148,13 +220,144 @@ def test_create_task_object_paths(mock_calendar):
 
 
 # ---- 14. process_assignments ----
-def test_process_assignments(mock_calendar):
+def test_process_assignments(mock_calendar, todo_returner):
     assignments_json = json.dumps({
         "CPEN311": {"assignments": [[[ "HW1", "desc", "pts", "2025-10-20T00:00:00Z" ]]]}
     })
-    mock_calendar.create_task_object = MagicMock(return_value="TODO")
+    mock_calendar.create_task_object = todo_returner
+    mock_calendar.process_assignments(assignments_json)
+    assert mock_calendar._new_components == [b"TODO"]
+    todo_returner.assert_called_once()
+
+
+def test_process_assignments_parses_shared_due_time_once(mock_calendar, mocker):
+    due = "2025-10-20T06:59:00Z"
+    assignments_json = json.dumps({
+        "CPEN311": {"assignments": [[["HW1", "d", "t", due], ["HW2", "d", "t", due]]]},
+        "MATH220": {"assignments": [[["PS1", "d", "t", due]]]},
+    })
+    parse = mocker.patch.object(
+        mock_calendar, "_parse_canvas_iso", wraps=mock_calendar._parse_canvas_iso
+    )
     mock_calendar.process_assignments(assignments_json)
-    mock_calendar.calendar.add_component.assert_called_with("TODO")
+    parse.assert_called_once_with(due)
+    assert len(mock_calendar.existing_uids) == 3
+
+
+def test_process_json_skips_duplicates_before_parsing(mock_calendar, mocker):
+    event = {
+        "course": "CPEN 311",
+        "event_type": "Final",
+        "date": "2025/12/10",
+        "begin_date_time": "08:30:00",
+        "end_date_time": "11:00:00",
+    }
+    known = dict(event, course="CPEN 331")
+    mock_calendar.process_json([known])
+    mock_calendar._new_components.clear()
+
+    parse = mocker.patch.object(
+        mock_calendar, "dateTimeParse", wraps=mock_calendar.dateTimeParse
+    )
+    mock_calendar.process_json([event, dict(event), known, {"course": "C"}])
+    # only the single new event is parsed (start + end) and written
+    assert parse.call_count == 2
+    assert len(mock_calendar._new_components) == 1
+    assert len(mock_calendar.existing_uids) == 2
+
+def test_recurring_event_expanded_until(mock_calendar):
+    meeting = {
+        "course": "CPEN 311",
+        "event_type": "Class Meeting",
+        "date": "2025/11/24",
+        "begin_date_time": "10:00:00",
+        "end_date_time": "11:00:00",
+        "frequency": "WEEKLY",
+        "by_day": ["MO", "WE"],
+        "until": "2025/12/04",
+        "exception_dates": ["2025/11/26"],
+    }
+    mock_calendar.process_json([meeting])
+    calendar = icalendar.Calendar.from_ical(
+        b"BEGIN:VCALENDAR\r\n" + b"".join(mock_calendar._new_components) + b"END:VCALENDAR\r\n"
+    )
+    events = calendar.walk("VEVENT")
+    starts = [e["DTSTART"].dt.strftime("%Y/%m/%d %H:%M") for e in events]
+    assert starts == ["2025/11/24 10:00", "2025/12/01 10:00", "2025/12/03 10:00"]
+    assert all("RRULE" not in e for e in events)
+    assert str(events[0]["UID"]).endswith("-10:00:00-0@notiflow.local")
+    assert len(mock_calendar.existing_uids) == 3
+
+    # re-posting the same meeting is recognised from its first occurrence
+    mock_calendar._new_components.clear()
+    mock_calendar.existing_uids = {_uid_key(str(e["UID"])) for e in events}
+    mock_calendar.process_json([meeting])
+    assert mock_calendar._new_components == []
+
+
+def expanded_starts(handler, event):
+    handler.process_json([event])
+    calendar = icalendar.Calendar.from_ical(
+        b"BEGIN:VCALENDAR\r\n" + b"".join(handler._new_components) + b"END:VCALENDAR\r\n"
+    )
+    return [e["DTSTART"].dt.strftime("%Y/%m/%d") for e in calendar.walk("VEVENT")]
+
+
+RECURRING = {
+    "course": "CPEN 311",
+    "event_type": "Class Meeting",
+    "date": "2025/11/03",
+    "begin_date_time": "10:00:00",
+    "end_date_time": "11:00:00",
+    "frequency": "WEEKLY",
+}
+
+
+@pytest.mark.parametrize(
+    "extra, count",
+    [
+        ({"until": "2026/04/30"}, 26),  # runs past term_end_date as asked
+        ({}, 5),  # no until: to term_end_date
+        ({"date": "2026/10/05"}, 17),  # term already over: default span
+    ],
+)
+def test_recurring_event_bounds(mock_calendar, extra, count):
+    starts = expanded_starts(mock_calendar, {**RECURRING, **extra})
+    assert len(starts) == count
+    assert starts[0] == {**RECURRING, **extra}["date"]
+
+
+def test_recurring_event_keeps_dtstart_off_byday(mock_calendar):
+    # 2025/11/03 is a Monday; RFC 5545 still counts DTSTART as the first one
+    starts = expanded_starts(mock_calendar, {**RECURRING, "by_day": ["WE"]})
+    assert starts[:2] == ["2025/11/03", "2025/11/05"]
+
+
+def test_recurring_event_without_occurrences_not_recorded(mock_calendar):
+    event = {**RECURRING, "until": "2025/11/01", "exception_dates": ["2025/11/03"]}
+    assert expanded_starts(mock_calendar, event) == []
+    assert mock_calendar.existing_uids == set()
+
+
+def test_recurring_event_stored_as_rrule_series_not_duplicated(mock_calendar):
+    # calendars written before occurrences were expanded hold the plain UID
+    uid = mock_calendar._event_uid(RECURRING)
+    mock_calendar.existing_uids = {_uid_key(uid)}
+    assert expanded_starts(mock_calendar, RECURRING) == []
+
+
+def test_process_json_shares_one_dtstamp(mock_calendar):
+    data = [
+        {"course": c, "event_type": "Final", "date": "2025/12/10",
+         "begin_date_time": "08:30:00", "end_date_time": "11:00:00"}
+        for c in ("CPEN 311", "CPEN 331")
+    ]
+    mock_calendar.process_json(data)
+    calendar = icalendar.Calendar.from_ical(
+        b"BEGIN:VCALENDAR\r\n" + b"".join(mock_calendar._new_components) + b"END:VCALENDAR\r\n"
+    )
+    stamps = {e["DTSTAMP"].to_ical() for e in calendar.walk("VEVENT")}
+    assert len(stamps) == 1
 
 
 # ---- 15. _parse_course_meetings ----
@@ -168,14 +371,26 @@ def test_parse_course_meetings_success(mock_calendar):
     parsed = mock_calendar._parse_course_meetings(raw)
     assert parsed["frequency"] == "WEEKLY"
     assert "MO" in parsed["by_day"]
+    # week order regardless of the order the frontend sent the keys in
+    reordered = dict(raw, days={"F": True, "Tu": True, "X": True, "M": False})
+    assert mock_calendar._parse_course_meetings(reordered)["by_day"] == ["TU", "FR"]
     bad = mock_calendar._parse_course_meetings({"startTime": "bad", "endTime": "12:00 PM", "days": {}})
     assert bad is None
 
 
+def test_parse_course_meetings_after_term_end(mock_calendar):
+    raw = {"className": "CPEN311", "startTime": "10:00 AM", "endTime": "12:00 PM",
+           "days": {"M": True}}
+    mock_calendar.term_end_date = "2000/01/01"
+    assert "until" not in mock_calendar._parse_course_meetings(raw)
+    mock_calendar.term_end_date = "2999/01/01"
+    assert mock_calendar._parse_course_meetings(raw)["until"] == "2999/01/01"
+
+
 # ---- 16. process_course_meetings ----
 def test_process_course_meetings_json_and_dict(mock_calendar):
-    mock_calendar._parse_course_meetings = MagicMock(return_value={"ok": True})
-    mock_calendar.process_json = MagicMock()
+    mock_calendar._parse_course_meetings = Mock(return_value={"ok": True})
+    mock_calendar.process_json = Mock()
     raw = {"className": "C", "startTime": "10:00 AM", "endTime": "12:00 PM", "days": {"M": True}}
     mock_calendar.process_course_meetings(raw)
     mock_calendar.process_json.assert_called_once()
@@ -184,28 +399,190 @@ def test_process_course_meetings_json_and_dict(mock_calendar):
     bad_json = '{"bad": }'
     mock_calendar.process_course_meetings(bad_json)
     mock_calendar.process_json.assert_not_called()
+    # raw request bodies are parsed without decoding first
+    mock_calendar.process_course_meetings(json.dumps(raw).encode())
+    mock_calendar._parse_course_meetings.assert_called_with(raw)
 
 
-@patch("Backend.iCalBackendNew.Path.is_file", return_value=True)
-@patch("Backend.iCalBackendNew.icalendar.Calendar.from_ical")
-def test_init_loads_existing_calendar(mock_from_ical, mock_isfile, tmp_path):
-    # Create a fake component with .name == "VEVENT"
-    fake_component = MagicMock()
-    fake_component.name = "VEVENT"
-    fake_component.get.return_value = "uid123"
-
-    fake_cal = MagicMock()
-    fake_cal.walk.return_value = [fake_component]
+def test_init_scans_uids_and_defers_parse(mocker, tmp_path):
+    mock_from_ical = mocker.patch("Backend.iCalBackendNew.icalendar.Calendar.from_ical")
+    fake_file = tmp_path / "calendar.ics"
+    fake_file.write_bytes(
+        b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:uid123\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    fake_cal = Mock(spec_set=CALENDAR_SPEC)
     mock_from_ical.return_value = fake_cal
 
-    fake_file = tmp_path / "calendar.ics"
-    fake_file.write_bytes(b"BEGIN:VCALENDAR\nEND:VCALENDAR")
+    handler = ICalHandler("fake_token", filename=str(fake_file))
 
-    with patch("builtins.open", mock_open(read_data=b"BEGIN:VCALENDAR\nEND:VCALENDAR")):
-        handler = ICalHandler("fake_token", filename=str(fake_file.name))
+    # UIDs come from the line scan, the calendar itself is not parsed yet
+    assert _uid_key("uid123") in handler.existing_uids
+    assert handler.calendar is None
+    mock_from_ical.assert_not_called()
 
-    # Verify it loaded correctly
+    handler._ensure_loaded()
     mock_from_ical.assert_called_once()
-    assert "uid123" in handler.existing_uids
     assert handler.calendar == fake_cal
 
+
+def test_scan_uids_folded_and_escaped(tmp_path):
+    ics = tmp_path / "calendar.ics"
+    ics.write_bytes(
+        b"BEGIN:VCALENDAR\r\n"
+        b"BEGIN:VTODO\r\nUID:CPEN311-ASSIGNMENT-HW1\\, part 2-2025-10-20T00:00\r\n"
+        b" :00Z@notiflow.local\r\nEND:VTODO\r\n"
+        b"BEGIN:VEVENT\r\nUID:plain@notiflow.local\r\nEND:VEVENT\r\n"
+        b"END:VCALENDAR\r\n"
+    )
+    assert _scan_uids(ics) == {
+        _uid_key("CPEN311-ASSIGNMENT-HW1, part 2-2025-10-20T00:00:00Z@notiflow.local"),
+        _uid_key("plain@notiflow.local"),
+    }
+
+
+def test_save_appends_to_existing_file(tmp_path, mocker):
+    ics = tmp_path / "calendar.ics"
+    event = {
+        "course": "CPEN 311",
+        "event_type": "Final",
+        "date": "2025/12/10",
+        "begin_date_time": "08:30:00",
+        "end_date_time": "11:00:00",
+    }
+    first = ICalHandler("token", filename=str(ics))
+    first.process_json([event])
+    first.save_calendar()
+
+    second = ICalHandler("token", filename=str(ics))
+    second.process_json([dict(event, course="CPEN 331")])
+    second.process_assignments(json.dumps(
+        {"CPEN 331": {"assignments": [[["HW1", "d", "t", "2025-10-20T06:59:00Z"]]]}}
+    ))
+    from_ical = mocker.patch("Backend.iCalBackendNew.icalendar.Calendar.from_ical")
+    second.save_calendar()
+    second.save_calendar()  # nothing new, nothing written
+    mocker.stop(from_ical)  # the real parser checks the file below
+    from_ical.assert_not_called()
+    assert second.calendar is None
+
+    calendar = icalendar.Calendar.from_ical(ics.read_bytes())
+    assert sorted(str(e["SUMMARY"]) for e in calendar.walk("VEVENT")) == [
+        "CPEN 311 - Final",
+        "CPEN 331 - Final",
+    ]
+    assert len(calendar.walk("VTODO")) == 1
+    assert ics.read_bytes().endswith(b"END:VCALENDAR\r\n")
+
+
+def test_handler_goes_stale_when_another_writes(tmp_path):
+    ics = tmp_path / "calendar.ics"
+    event = {
+        "course": "CPEN 311",
+        "event_type": "Final",
+        "date": "2025/12/10",
+        "begin_date_time": "08:30:00",
+        "end_date_time": "11:00:00",
+    }
+    a = ICalHandler("token-a", filename=str(ics))
+    b = ICalHandler("token-b", filename=str(ics))
+    a.process_json([event])
+    a.save_calendar()
+
+    assert not a.is_stale()
+    assert b.is_stale()  # its UID index predates a's write
+
+    rebuilt = ICalHandler("token-b", filename=str(ics))
+    assert not rebuilt.is_stale()
+    rebuilt.process_json([event])
+    rebuilt.save_calendar()
+    assert ics.read_bytes().count(b"\nUID:") == 1
+
+
+def test_debug_check_cross_checks_uid_index(tmp_path, monkeypatch):
+    monkeypatch.setattr("Backend.iCalBackendNew._DEBUG_CHECK", True)
+    ics = tmp_path / "calendar.ics"
+    handler = ICalHandler("token", filename=str(ics))
+    handler.process_json([{
+        "course": "CPEN 311",
+        "event_type": "Final",
+        "date": "2025/12/10",
+        "begin_date_time": "08:30:00",
+        "end_date_time": "11:00:00",
+    }])
+    handler.save_calendar()  # checked after writing
+
+    reloaded = ICalHandler("token", filename=str(ics))  # checked after scanning
+    reloaded.existing_uids.clear()
+    with pytest.raises(AssertionError):
+        reloaded._check_uid_index()
+
+def test_scan_uids_empty_file(tmp_path):
+    ics = tmp_path / "calendar.ics"
+    ics.write_bytes(b"")
+    assert _scan_uids(ics) == set()
+
+
+def test_unparseable_file_keeps_pending_uids(tmp_path):
+    ics = tmp_path / "calendar.ics"
+    ics.write_bytes(b"")  # exists, but cannot be appended to or parsed
+    event = {
+        "course": "CPEN 311",
+        "event_type": "Final",
+        "date": "2025/12/10",
+        "begin_date_time": "08:30:00",
+        "end_date_time": "11:00:00",
+    }
+    handler = ICalHandler("token", filename=str(ics))
+    handler.process_json([event])
+    handler.save_calendar()
+    assert len(handler.existing_uids) == 1
+
+    handler.process_json([event])
+    handler.save_calendar()
+    assert ics.read_bytes().count(b"\nUID:") == 1
+
+
+FINAL_EVENT = {
+    "course": "CPEN 311",
+    "event_type": "Final",
+    "date": "2025/12/10",
+    "begin_date_time": "08:30:00",
+    "end_date_time": "11:00:00",
+}
+
+
+def test_save_appends_when_trailer_missing(tmp_path):
+    ics = tmp_path / "calendar.ics"
+    ics.write_bytes(b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:old\r\nEND:VEVENT")
+    handler = ICalHandler("token", filename=str(ics))
+    handler.process_json([FINAL_EVENT])
+    handler.save_calendar()
+
+    data = ics.read_bytes()
+    assert data.startswith(b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:old\r\nEND:VEVENT\r\n")
+    assert data.count(b"\nUID:") == 2
+    assert data.endswith(b"END:VCALENDAR\r\n")
+
+
+def test_failed_append_restores_file(tmp_path, mocker):
+    ics = tmp_path / "calendar.ics"
+    handler = ICalHandler("token", filename=str(ics))
+    handler.process_json([FINAL_EVENT])
+    handler.save_calendar()
+    before = ics.read_bytes()
+
+    real_write = os.write
+    calls = []
+
+    def failing_write(fd, data):
+        calls.append(len(data))
+        if len(calls) == 2:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return real_write(fd, bytes(data[:10]) if len(calls) == 1 else data)
+
+    mocker.patch("Backend.iCalBackendNew.os.write", failing_write)
+    again = ICalHandler("token", filename=str(ics))
+    again.process_json([dict(FINAL_EVENT, course="CPEN 331")])
+    with pytest.raises(OSError):
+        again.save_calendar()
+    assert ics.read_bytes() == before
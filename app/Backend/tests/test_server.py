@@ -1,213 +1,287 @@
-import os
-import sys
-import pytest
-
-# --- make Backend dir importable so `import server` works no matter how uv/pytest runs ---
-
-CURRENT_DIR = os.path.dirname(__file__)          # .../app/Backend/tests
-BACKEND_DIR = os.path.dirname(CURRENT_DIR)       # .../app/Backend
-
-if BACKEND_DIR not in sys.path:
-    sys.path.insert(0, BACKEND_DIR)
-
-import Backend.server as server
-
-
-@pytest.fixture
-def client():
-    server.app.testing = True
-    return server.app.test_client()
-
-
-# ---------- Fake ICalHandler for announcements/assignments/finals ----------
-
-class FakeICalHandler:
-    """Simple fake to track how ICalHandler is used."""
-    instances = []
-
-    def __init__(self, token):
-        self.token = token
-        self.processed = None
-        self.saved = False
-        FakeICalHandler.instances.append(self)
-
-    def process_json(self, data):
-        self.processed = data
-
-    # If you later switch announcements/assignments to use process_assignments, we support that too:
-    def process_assignments(self, data):
-        self.processed = data
-
-    def save_calendar(self):
-        self.saved = True
-
-
-# ---------- /api/courses ----------
-
-def test_classes_success(client, monkeypatch):
-    called = {}
-
-    def fake_getClasses(token):
-        called["token"] = token
-        return ["CPEN 221", "MATH 220"]
-
-    monkeypatch.setattr(server, "getClasses", fake_getClasses)
-
-    resp = client.get("/api/courses?token=test-token-123")
-    assert resp.status_code == 200
-    assert resp.get_json() == ["CPEN 221", "MATH 220"]
-    assert called["token"] == "test-token-123"
-
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
 
-def test_classes_no_token(client, monkeypatch):
-    """Covers behaviour when token is missing (token=None)."""
-    captured = {}
-
-    def fake_getClasses(token):
-        captured["token"] = token
-        return []
-
-    monkeypatch.setattr(server, "getClasses", fake_getClasses)
-
-    resp = client.get("/api/courses")
-    assert resp.status_code == 200
-    assert resp.get_json() == []
-    # Make sure None is passed through
-    assert captured["token"] is None
-
-
-# ---------- /api/finalexam ----------
-
-def test_finalexam_success(client, monkeypatch):
-    # Reset fake state so tests don't interfere with each other
-    FakeICalHandler.instances = []
-
-    called = {}
-
-    def fake_get_finals(courses):
-        called["courses"] = courses
-        # Return some JSON-serializable structure
-        return {"finals": [{"course": c, "date": "2099-01-01"} for c in courses]}
-
-    # Patch the FinalExamFetcher used inside server.py
-    monkeypatch.setattr(server.fe, "get_finals", fake_get_finals)
-    # Patch ICalHandler so we don't hit the real calendar code
-    monkeypatch.setattr(server, "ICalHandler", FakeICalHandler)
-
-    resp = client.get("/api/finalexam?course[]=CPEN_221&course[]=MATH_220")
-    assert resp.status_code == 200
-    data = resp.get_json()
-    assert "finals" in data
-    assert len(data["finals"]) == 2
-    assert called["courses"] == ["CPEN_221", "MATH_220"]
-
-
-def test_finalexam_empty_list(client, monkeypatch):
-    """Covers branch where getlist returns empty list."""
-    FakeICalHandler.instances = []
-
-    called = {"courses": None}
-
-    def fake_get_finals(courses):
-        called["courses"] = courses
-        return {"finals": []}
-
-    monkeypatch.setattr(server.fe, "get_finals", fake_get_finals)
-    monkeypatch.setattr(server, "ICalHandler", FakeICalHandler)
-
-    resp = client.get("/api/finalexam")  # no course[] query params
-    assert resp.status_code == 200
-    assert resp.get_json() == {"finals": []}
-    assert called["courses"] == []
-
-
-# ---------- /api/announcements ----------
-
-def test_announcements_success(client, monkeypatch):
-    FakeICalHandler.instances = []
+import pytest
+from flask import request
 
-    # Replace ICalHandler with our fake one
-    monkeypatch.setattr(server, "ICalHandler", FakeICalHandler)
+FINALS_PAYLOAD = {
+    "finals": [
+        {"course": "CPEN_221", "date": "2099-01-01"},
+        {"course": "MATH_220", "date": "2099-01-01"},
+    ]
+}
+# jsonify output for an empty finals list; trivial payloads are compared as bytes
+EMPTY_FINALS = json.dumps({"finals": []}, separators=(",", ":")).encode()
 
-    def fake_announcement_main(token):
-        # return some JSON-serializable structure
-        return {"announcements": [{"title": "Hello", "course": "CPEN 221"}]}
 
-    monkeypatch.setattr(server, "announcement_main", fake_announcement_main)
+@pytest.fixture(autouse=True)
+def clear_handlers(server_mod):
+    """
+    Empty the handler cache around each test.
 
-    resp = client.get("/api/announcements?token=my-ann-token")
-    assert resp.status_code == 200
+    With fakes built per test and monkeypatch undoing every patch, this leaves
+    no state shared between tests, so the file also runs under
+    `pytest -n auto --dist=loadfile`.
+    """
+    server_mod._HANDLERS.clear()
+    yield
+    server_mod._HANDLERS.clear()
 
-    # Flask will JSONify dict return values into a proper JSON response
-    data = resp.get_json()
-    assert data == {"announcements": [{"title": "Hello", "course": "CPEN 221"}]}
 
-    # Check that ICalHandler was used correctly
-    assert len(FakeICalHandler.instances) == 1
-    handler = FakeICalHandler.instances[0]
-    assert handler.token == "my-ann-token"
-    assert handler.processed == data
-    assert handler.saved is True
+@pytest.fixture(scope="session")
+def client(server_mod):
+    # no test touches app.config, and monkeypatch undoes patches per test,
+    # so one client serves the whole file
+    return server_mod.app.test_client()
 
 
-def test_announcements_failure(client, monkeypatch):
-    """Force an exception to cover the error branch and 500 response."""
-    FakeICalHandler.instances = []
+@pytest.fixture(scope="session")
+def fe(server_mod):
+    # the FinalExamFetcher server.py actually calls; with Backend on sys.path
+    # it is not the same class as Backend.final_exam_feature's, so bind it here
+    return server_mod.fe
 
-    monkeypatch.setattr(server, "ICalHandler", FakeICalHandler)
 
-    def fake_announcement_main(token):
-        raise RuntimeError("boom!")
+# ---------- Fake ICalHandler for announcements/assignments/finals ----------
 
-    monkeypatch.setattr(server, "announcement_main", fake_announcement_main)
+@pytest.fixture
+def ical_factory():
+    """A fresh fake ICalHandler class per test; `created` lists its instances."""
+    created = []
 
-    resp = client.get("/api/announcements?token=bad-token")
-    assert resp.status_code == 500
-    data = resp.get_json()
-    assert "error" in data
-    # Optional: check the error message we raised is included
-    assert "boom" in data["error"]
+    class FakeICalHandler:
+        """Simple fake to track how ICalHandler is used."""
 
+        stale = False
 
-# ---------- /api/assignments ----------
+        def __init__(self, token, filename=None):
+            self.token = token
+            self.filename = filename
+            self.processed = None
+            self.saved = False
+            created.append(self)
 
-def test_assignments_success(client, monkeypatch):
-    FakeICalHandler.instances = []
+        def process_json(self, data):
+            self.processed = data
 
-    monkeypatch.setattr(server, "ICalHandler", FakeICalHandler)
+        # If you later switch announcements/assignments to use process_assignments, we support that too:
+        def process_assignments(self, data):
+            self.processed = data
 
-    called = {}
+        def save_calendar(self):
+            self.saved = True
 
-    def fake_mapCourses(token):
-        called["token"] = token
-        # Can be whatever your real function returns; use dict for clean JSON
-        return {"assignments": [{"name": "PA1", "due": "2099-01-01"}]}
+        def is_stale(self):
+            return self.stale
 
-    monkeypatch.setattr(server, "mapCourses", fake_mapCourses)
+    FakeICalHandler.created = created
+    return FakeICalHandler
 
-    resp = client.get("/api/assignments?token=assign-token-42")
-    assert resp.status_code == 200
 
-    # They return assignments directly (not jsonify), but Flask will still
-    # convert a dict to a proper JSON response.
-    data = resp.get_json()
-    assert data == {"assignments": [{"name": "PA1", "due": "2099-01-01"}]}
-    assert called["token"] == "assign-token-42"
+@pytest.fixture(autouse=True)
+def fake_ical(server_mod, ical_factory):
+    """Keep every test off the real calendar code."""
+    with patch.object(server_mod, "ICalHandler", ical_factory):
+        yield ical_factory
 
 
-def test_assignments_failure(client, monkeypatch):
-    """Covers exception path and 500 response for /api/assignments."""
-    FakeICalHandler.instances = []
+@pytest.fixture(scope="session")
+def view(server_mod):
+    """
+    Calls endpoints directly under a request context, skipping the WSGI
+    round trip of the test client. `view.get(path)` returns a Response like
+    `client.get(path)` does.
+    """
+    app = server_mod.app
 
-    monkeypatch.setattr(server, "ICalHandler", FakeICalHandler)
+    def get(path, **kwargs):
+        with app.test_request_context(path, **kwargs):
+            # pushing the context already matched the URL rule
+            rv = app.view_functions[request.url_rule.endpoint](**request.view_args)
+            return app.make_response(rv)
 
-    def fake_mapCourses(token):
-        raise ValueError("assignments exploded")
+    return SimpleNamespace(get=get)
 
-    monkeypatch.setattr(server, "mapCourses", fake_mapCourses)
 
-    resp = client.get("/api/assignments?token=bad-token")
-    assert resp.status_code == 500
-    data = resp.get_json()
-    assert "error" in data
-    assert "assignments exploded" in data["error"]
+@pytest.fixture
+def patch_callable(monkeypatch, server_mod):
+    """Replace `target.attr` with a stub; returns a dict capturing its last call."""
+
+    def _patch(attr, return_value=None, side_effect=None, target=None):
+        captured = {}
+
+        def fn(*args, **kwargs):
+            captured["args"] = args
+            captured["kwargs"] = kwargs
+            if side_effect is not None:
+                raise side_effect
+            return return_value
+
+        monkeypatch.setattr(server_mod if target is None else target, attr, fn)
+        return captured
+
+    return _patch
+
+
+class TestServerAPI:
+    """Endpoint tests; fixtures above are shared, fakes are rebuilt per test."""
+
+    # ---------- /api/courses ----------
+
+    def test_classes_success(self, client, patch_callable):
+        captured = patch_callable("getClasses", return_value=["CPEN 221", "MATH 220"])
+
+        resp = client.get("/api/courses", query_string={"token": "test-token-123"})
+        assert resp.status_code == 200
+        assert resp.get_json() == ["CPEN 221", "MATH 220"]
+        assert captured["args"] == ("test-token-123",)
+
+    def test_classes_no_token(self, view, patch_callable):
+        """Covers behaviour when token is missing (token=None)."""
+        captured = patch_callable("getClasses", return_value=[])
+
+        resp = view.get("/api/courses")
+        assert resp.status_code == 200
+        assert resp.data in (b"[]\n", b"[]")
+        # Make sure None is passed through
+        assert captured["args"] == (None,)
+
+    # ---------- /api/finalexam ----------
+
+    def test_finalexam_success(self, view, patch_callable, fe):
+        # Patch the FinalExamFetcher used inside server.py
+        captured = patch_callable("get_finals", return_value=FINALS_PAYLOAD, target=fe)
+
+        resp = view.get(
+            "/api/finalexam", query_string={"course[]": ["CPEN_221", "MATH_220"]}
+        )
+        assert resp.status_code == 200
+        assert resp.get_json() == FINALS_PAYLOAD
+        assert captured["args"] == (["CPEN_221", "MATH_220"],)
+
+    def test_finalexam_empty_list(self, view, patch_callable, fe):
+        """Covers branch where getlist returns empty list."""
+        captured = patch_callable("get_finals", return_value={"finals": []}, target=fe)
+
+        resp = view.get("/api/finalexam")  # no course[] query params
+        assert resp.status_code == 200
+        assert resp.data.rstrip() == EMPTY_FINALS
+        assert captured["args"] == ([],)
+
+    # ---------- /api/announcements and /api/assignments ----------
+
+    @pytest.mark.parametrize(
+        "endpoint, patch_target, payload, exc",
+        [
+            (
+                "/api/announcements",
+                "announcement_main",
+                {"announcements": [{"title": "Hello", "course": "CPEN 221"}]},
+                None,
+            ),
+            # Force an exception to cover the error branch and 500 response
+            ("/api/announcements", "announcement_main", None, RuntimeError("boom!")),
+            (
+                "/api/assignments",
+                "mapCourses",
+                {"assignments": [{"name": "PA1", "due": "2099-01-01"}]},
+                None,
+            ),
+            ("/api/assignments", "mapCourses", None, ValueError("assignments exploded")),
+        ],
+        ids=[
+            "announcements-success",
+            "announcements-failure",
+            "assignments-success",
+            "assignments-failure",
+        ],
+    )
+    def test_canvas_endpoints(
+        self, view, patch_callable, fake_ical, endpoint, patch_target, payload, exc
+    ):
+        captured = patch_callable(patch_target, return_value=payload, side_effect=exc)
+
+        resp = view.get(endpoint, query_string={"token": "tok-42"})
+        assert captured["args"] == ("tok-42",)
+        data = resp.get_json()
+
+        if exc is not None:
+            assert resp.status_code == 500
+            assert str(exc) in data["error"]
+            return
+
+        # Flask will JSONify dict return values into a proper JSON response
+        assert resp.status_code == 200
+        assert data == payload
+
+        # Check that ICalHandler was used correctly
+        (handler,) = fake_ical.created
+        assert handler.token == "tok-42"
+        assert handler.processed == payload
+        assert handler.saved is True
+
+    # ---------- cached ICalHandler ----------
+
+    def test_handler_shared_across_tokens(self, view, patch_callable, fake_ical):
+        patch_callable("announcement_main", return_value={"announcements": []})
+
+        for token in ("tok", "tok", "other"):
+            view.get("/api/announcements", query_string={"token": token})
+
+        # every token writes the same calendar file, so they share one handler
+        (handler,) = fake_ical.created
+        assert handler.filename == "calendar.ics"
+
+    def test_stale_handler_rebuilt(self, view, patch_callable, fake_ical):
+        patch_callable("announcement_main", return_value={"announcements": []})
+
+        view.get("/api/announcements", query_string={"token": "tok"})
+        fake_ical.created[0].stale = True  # file written elsewhere
+        view.get("/api/announcements", query_string={"token": "tok"})
+
+        assert len(fake_ical.created) == 2
+
+    def test_update_holds_lock_from_lookup_to_save(self, monkeypatch, server_mod, fake_ical):
+        # another request must not drop or rebuild the handler in between
+        held = []
+
+        class CountingLock:
+            def __enter__(self):
+                held.append("acquire")
+
+            def __exit__(self, *exc):
+                held.append("release")
+
+        monkeypatch.setattr(server_mod, "_LOCK", CountingLock())
+        server_mod._update_calendar("tok", lambda handler: handler.process_json([1]))
+
+        assert held == ["acquire", "release"]
+        (handler,) = fake_ical.created
+        assert handler.processed == [1] and handler.saved
+
+    def test_handler_dropped_on_save_error(self, view, patch_callable, server_mod, fake_ical):
+        class FailingSave(fake_ical):
+            def save_calendar(self):
+                raise OSError("disk full")
+
+        patch_callable("announcement_main", return_value={"announcements": []})
+
+        with patch.object(server_mod, "ICalHandler", FailingSave):
+            resp = view.get("/api/announcements", query_string={"token": "tok"})
+        assert resp.status_code == 500
+        assert not server_mod._HANDLERS
+
+    def test_fetch_runs_off_the_request_thread(self, view, monkeypatch, server_mod):
+        seen = {}
+
+        def fake_mapCourses(token):
+            seen["thread"] = threading.current_thread().name
+            return {"assignments": []}
+
+        monkeypatch.setattr(server_mod, "mapCourses", fake_mapCourses)
+
+        resp = view.get("/api/assignments", query_string={"token": "tok"})
+        assert resp.status_code == 200
+        assert seen["thread"].startswith("canvas")